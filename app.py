@@ -1,14 +1,36 @@
 import os
 import json
 import numpy as np
-import pandas as pd
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
-from datetime import datetime
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, g
+import hashlib
+import hmac
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from dotenv import load_dotenv
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import subprocess
 import sys
+import uuid
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # Windows (development): file lock tidak tersedia
+    fcntl = None
+
+# Import graph serving hanya NumPy + Flask: pandas / scikit-learn / subprocess
+# di-import di dalam fungsi yang butuh (refit, admin update, generate visualisasi)
+import credit_model
+from credit_dataset import CompactDataset, load_dataset, default_dataset_path
+from metrics import Metrics, StageTimer, STAGE_BUCKETS, clear_snapshots
+from prediction_cache import PredictionCache
+from micro_batch import MicroBatcher
+from neighbor_index import load_or_build, DEFAULT_INDEX_PATH
+from input_schema import InputSchema
+from what_if import WhatIfAnalysis
+from drift_monitor import DriftBaseline, DriftMonitor
+from contact_store import ContactStore, ContactStoreError
 
 load_dotenv()
 
@@ -17,75 +39,225 @@ app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-producti
 
 # Configuration
 app.config['JSON_SORT_KEYS'] = False
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+app.config['API_CACHE_MAX_AGE'] = int(os.environ.get('API_CACHE_MAX_AGE', 300))
+# Batas k untuk /api/neighbors dan ?knn= di /api/predict
+app.config['MAX_NEIGHBORS'] = int(os.environ.get('MAX_NEIGHBORS', 100))
+# Batas jumlah titik grid (produk semua field) per request /api/predict/what-if
+app.config['WHAT_IF_MAX_GRID'] = int(os.environ.get('WHAT_IF_MAX_GRID', 10000))
+# Header Server-Timing berisi durasi tiap tahap scoring (untuk debugging di browser)
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0') == '1'
 
-# Global variables for ML models
-kmeans_model = None
-scaler = None
-centroids = None
-cluster_stats = None
-df_with_clusters = None
-feature_columns = None
-encoded_feature_columns = None
-categorical_cols = None
+# State model yang sedang dipakai (immutable):
+# - model: CreditModel
+# - dataset: dataset CSV dalam kolom NumPy ringkas (dibagi antar worker saat preload)
+# - input_schema: schema validasi input (tipe, level kategori, rentang) dari data training
+# - neighbor_index: index k-NN applicant historis (baris dataset di ruang fitur ter-scale model)
+# - cached_responses: response JSON yang sudah di-serialize sekali saat model dimuat
+ModelState = namedtuple('ModelState', ['model', 'dataset', 'input_schema', 'neighbor_index', 'cached_responses'])
+# Diganti dengan satu assignment saat reload/update; route cukup membaca global
+# ini sekali di awal request supaya seluruh request memakai satu snapshot yang
+# konsisten (model, dataset, dan index dari versi yang sama).
+state = None
+# (mtime_ns, size) model bundle + CSV yang sedang dipakai, untuk deteksi perubahan
+loaded_bundle_signature = None
 
-def load_credit_models():
-    """Load KMeans model dan data CSV"""
-    global kmeans_model, scaler, centroids, cluster_stats, df_with_clusters, feature_columns
-    global encoded_feature_columns, categorical_cols
+CSV_PATH = os.path.join(os.path.dirname(__file__), 'credit_risk_with_clusters.csv')
+# Dataset kolumnar hasil konversi CSV (dibuat ulang otomatis kalau CSV berubah)
+DATASET_PATH = os.environ.get('DATASET_PATH', default_dataset_path(CSV_PATH))
+MODEL_BUNDLE_PATH = os.environ.get('MODEL_BUNDLE_PATH', credit_model.DEFAULT_BUNDLE_PATH)
+# Index k-NN tersimpan (dibangun ulang otomatis kalau versi model / dataset berubah)
+NEIGHBOR_INDEX_PATH = os.environ.get('NEIGHBOR_INDEX_PATH', DEFAULT_INDEX_PATH)
+# Mode scoring opsional: jarak ke centroid sebagai satu matmul float32 (norm centroid
+# dihitung sekali), opsional memangkas fitur dengan separasi centroid <= toleransi.
+# Hanya dipakai kalau agreement assignment dengan float64 di dataset >= SCORING_MIN_AGREEMENT
+SCORING_PRECISION = os.environ.get('SCORING_PRECISION', 'float64')
+SCORING_PRUNE_TOLERANCE = float(os.environ.get('SCORING_PRUNE_TOLERANCE', 0))
+SCORING_MIN_AGREEMENT = float(os.environ.get('SCORING_MIN_AGREEMENT', 1.0))
+LABEL_AGREEMENT_THRESHOLD = float(os.environ.get('LABEL_AGREEMENT_THRESHOLD',
+                                                 credit_model.LABEL_AGREEMENT_THRESHOLD))
+# Interval (detik) cek apakah worker lain sudah menulis model bundle baru
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 5))
+
+model_reload_lock = threading.Lock()
+last_reload_check = 0.0
+
+# Metrics Prometheus; snapshot tiap worker digabung di /metrics lewat METRICS_DIR
+# (kosongkan METRICS_DIR untuk metrics per proses saja)
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(os.path.dirname(__file__), '.cache', 'metrics'))
+metrics_registry = Metrics(METRICS_DIR or None, float(os.environ.get('METRICS_FLUSH_INTERVAL', 1)))
+metrics_registry.counter('credit_http_requests_total', 'Jumlah request HTTP per route, method, dan status')
+metrics_registry.histogram('credit_http_request_duration_seconds', 'Latency request HTTP per route (detik)')
+metrics_registry.histogram('credit_predict_stage_seconds', 'Durasi tiap tahap scoring (detik)', STAGE_BUCKETS)
+metrics_registry.counter('credit_cluster_assignments_total', 'Jumlah applicant yang di-assign ke tiap cluster')
+metrics_registry.gauge('credit_model_load_seconds', 'Durasi load model terakhir (detik)')
+metrics_registry.gauge('credit_model_info', 'Versi model yang sedang dipakai (1 = aktif)')
+metrics_registry.counter('credit_prediction_cache_total', 'Lookup cache prediksi (hit lokal / bersama, miss)')
+metrics_registry.gauge('credit_scoring_agreement',
+                       'Agreement assignment mode scoring aktif vs float64 penuh di dataset tersimpan')
+metrics_registry.histogram('credit_predict_microbatch_size', 'Jumlah request /api/predict per micro-batch',
+                           (1, 2, 4, 8, 16, 32, 64, 128))
+
+# Monitor drift input traffic prediksi vs data training (/api/drift); snapshot tiap
+# worker digabung lewat DRIFT_DIR (kosongkan untuk per proses saja), DRIFT_MONITOR=0 = nonaktif
+DRIFT_DIR = os.environ.get('DRIFT_DIR', os.path.join(os.path.dirname(__file__), '.cache', 'drift'))
+drift_monitor = (DriftMonitor(DRIFT_DIR or None, float(os.environ.get('DRIFT_FLUSH_INTERVAL', 5)))
+                 if os.environ.get('DRIFT_MONITOR', '1') != '0' else None)
+
+# Cache hasil /api/predict untuk payload identik (retry dari sistem upstream);
+# PREDICTION_CACHE_SQLITE mengaktifkan cache bersama antar worker
+prediction_cache = PredictionCache(int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)),
+                                   float(os.environ.get('PREDICTION_CACHE_TTL', 300)),
+                                   os.environ.get('PREDICTION_CACHE_SQLITE') or None)
+
+def score_micro_batch(items):
+    """Jarak ke centroid untuk beberapa request /api/predict sekaligus.
+
+    items: list (model, vektor hasil scale); dikelompokkan per model karena
+    request yang berjalan saat hot reload bisa memakai snapshot model lama.
+    """
+    metrics_registry.observe('credit_predict_microbatch_size', len(items))
+    results = [None] * len(items)
+    groups = {}
+    for i, (item_model, _) in enumerate(items):
+        groups.setdefault(id(item_model), (item_model, []))[1].append(i)
+    for item_model, index in groups.values():
+        distances = item_model.scaled_distances(np.stack([items[i][1] for i in index]))
+        for i, row in zip(index, distances):
+            results[i] = row
+    return results
+
+# Micro-batching request /api/predict yang bersamaan (berguna dengan worker gthread);
+# PREDICT_MICRO_BATCH_MS = waktu tunggu maksimal leader, 0 = nonaktif
+PREDICT_MICRO_BATCH_MS = float(os.environ.get('PREDICT_MICRO_BATCH_MS', 0))
+micro_batcher = (MicroBatcher(score_micro_batch, PREDICT_MICRO_BATCH_MS / 1000,
+                              int(os.environ.get('PREDICT_MICRO_BATCH_MAX', 64)))
+                 if PREDICT_MICRO_BATCH_MS > 0 else None)
+
+@contextmanager
+def model_file_lock(blocking=True):
+    """Lock antar proses (file lock) untuk update / reload CSV + model bundle.
+    
+    Yield True kalau lock didapat; dengan blocking=False yield False kalau lock
+    sedang dipegang proses lain (mis. admin update yang belum selesai).
+    """
+    lock_path = f"{MODEL_BUNDLE_PATH}.lock"
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+    with open(lock_path, 'w') as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def bundle_signature():
+    """(mtime_ns, size) model bundle dan CSV sumber (None untuk file yang belum ada).
     
+    CSV ikut dipantau: CSV yang diedit / diganti memicu reload (refit kalau bundle
+    basi) sehingga cached response dan ETag tidak tertinggal.
+    """
+    signature = []
+    for path in (MODEL_BUNDLE_PATH, CSV_PATH):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+            continue
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+def apply_scoring_mode(new_model, new_dataset):
+    """Pasang CompactScorer (SCORING_PRECISION / SCORING_PRUNE_TOLERANCE) kalau assignment-nya sama.
+    
+    Agreement dihitung terhadap jarak float64 penuh di seluruh dataset tersimpan;
+    di bawah SCORING_MIN_AGREEMENT model tetap memakai float64 penuh.
+    """
+    if SCORING_PRECISION == 'float64' and SCORING_PRUNE_TOLERANCE <= 0:
+        return new_model
+    if SCORING_PRECISION not in ('float32', 'float64'):
+        print(f"! SCORING_PRECISION={SCORING_PRECISION} tidak dikenal - memakai float64")
+        return new_model
+    
+    scorer = credit_model.CompactScorer(new_model.centroids, SCORING_PRECISION, SCORING_PRUNE_TOLERANCE)
+    X_scaled = new_model.scale(new_model.encode_columns(new_dataset))
+    agreement = new_model.scorer_agreement(scorer, X_scaled)
+    mode = scorer.describe(new_model.encoded_feature_columns)
+    metrics_registry.set('credit_scoring_agreement', agreement)
+    description = (f"{mode['dtype']}, {len(mode['pruned_features'])} fitur dipangkas "
+                   f"{mode['pruned_features']}")
+    if agreement < SCORING_MIN_AGREEMENT:
+        print(f"! Scoring {description}: agreement {agreement:.4%} < {SCORING_MIN_AGREEMENT:.4%} "
+              f"- tetap float64 penuh")
+        return new_model
+    print(f"✓ Scoring {description}: agreement {agreement:.4%} dengan float64 penuh")
+    return new_model.with_scorer(scorer)
+
+def install_models(new_model, new_dataset):
+    """Swap model + dataset + schema + cached responses + neighbor index untuk request berikutnya.
+    
+    Return ModelState baru.
+    """
+    global state, loaded_bundle_signature
+    new_model = apply_scoring_mode(new_model, new_dataset)
+    new_input_schema = InputSchema.compile(new_model, new_dataset)
+    new_cached_responses = build_cached_responses(new_model, new_dataset)
+    new_neighbor_index = load_or_build(NEIGHBOR_INDEX_PATH, new_model, new_dataset)
+    new_drift_baseline = DriftBaseline.compile(new_model, new_dataset) if drift_monitor is not None else None
+    loaded_bundle_signature = bundle_signature()
+    if state is not None and state.model.version != new_model.version:
+        metrics_registry.set('credit_model_info', 0, (('version', state.model.version),))
+    metrics_registry.set('credit_model_info', 1, (('version', new_model.version),))
+    state = ModelState(new_model, new_dataset, new_input_schema, new_neighbor_index, new_cached_responses)
+    if drift_monitor is not None:
+        drift_monitor.install(new_drift_baseline)
+    # Hasil prediksi model lama tidak berlaku lagi
+    prediction_cache.clear(new_model.version)
+    return state
+
+def load_credit_models():
+    """Load model bundle dan dataset (refit hanya kalau bundle tidak ada / basi)"""
+    load_start = time.perf_counter()
     try:
-        # Load CSV dengan relative path (support untuk Railway)
-        csv_path = os.path.join(os.path.dirname(__file__), 'credit_risk_with_clusters.csv')
-        df_with_clusters = pd.read_csv(csv_path)
-        
-        # Get feature columns (semua except Cluster dan loan_status)
-        feature_columns = [col for col in df_with_clusters.columns 
-                          if col not in ['Cluster', 'loan_status']]
-        
-        # Prepare features
-        X = df_with_clusters[feature_columns].copy()
-        
-        # Handle missing values - fill numeric with median, categorical with mode
-        numeric_cols = X.select_dtypes(include=[np.number]).columns
-        categorical_cols = X.select_dtypes(include=['object']).columns.tolist()
-        
-        for col in numeric_cols:
-            X[col] = X[col].fillna(X[col].median())
-        
-        for col in categorical_cols:
-            X[col] = X[col].fillna(X[col].mode()[0] if len(X[col].mode()) > 0 else 'UNKNOWN')
-        
-        # One-hot encode categorical variables
-        X_encoded = pd.get_dummies(X, columns=categorical_cols, drop_first=True)
-        encoded_feature_columns = X_encoded.columns.tolist()
-        
-        # Standardize
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X_encoded)
-        
-        # Load KMeans model (retrain dari data)
-        n_clusters = int(df_with_clusters['Cluster'].max()) + 1
-        kmeans_model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        kmeans_model.fit(X_scaled)
-        centroids = kmeans_model.cluster_centers_
-        
-        # Calculate default rate per cluster
-        cluster_stats = {}
-        for cluster_id in range(n_clusters):
-            cluster_mask = df_with_clusters['Cluster'] == cluster_id
-            default_rate = df_with_clusters[cluster_mask]['loan_status'].mean()
-            cluster_size = cluster_mask.sum()
-            cluster_stats[cluster_id] = {
-                'default_rate': float(default_rate),
-                'size': int(cluster_size),
-                'approval_rate': float(1 - default_rate),
-                'cluster_id': cluster_id
-            }
-        
-        print("✓ Credit risk models loaded successfully")
-        print(f"  - Clusters: {n_clusters}")
-        print(f"  - Features: {len(encoded_feature_columns)}")
-        print(f"  - Categorical columns: {categorical_cols}")
+        # Dataset .npz kolumnar; CSV hanya di-parse kalau .npz belum ada / basi
+        new_dataset, csv_sha256 = load_dataset(CSV_PATH, DATASET_PATH)
+        
+        try:
+            new_model = credit_model.load_bundle(MODEL_BUNDLE_PATH, expected_sha256=csv_sha256)
+            # Re-predict baris CSV: label model harus sama dengan kolom Cluster
+            agreement = new_model.verify_labels(new_dataset, new_dataset.columns['Cluster'],
+                                                LABEL_AGREEMENT_THRESHOLD)
+            print(f"✓ Model bundle loaded: {MODEL_BUNDLE_PATH} (label agreement {agreement:.2%})")
+        except credit_model.BundleError as e:
+            # Fallback: refit dari CSV lalu simpan supaya worker berikutnya tinggal load
+            print(f"! {e} - refit model dari CSV")
+            new_model = credit_model.fit_credit_model(new_dataset.to_frame(), csv_sha256)
+            if new_model.label_agreement < LABEL_AGREEMENT_THRESHOLD:
+                # cluster_stats tetap konsisten (dihitung dari assignment model sendiri)
+                print(f"! Label agreement hanya {new_model.label_agreement:.2%} - "
+                      f"cek ulang kolom Cluster di {CSV_PATH}")
+            try:
+                credit_model.save_bundle(new_model, MODEL_BUNDLE_PATH)
+                print(f"✓ Model bundle tersimpan: {MODEL_BUNDLE_PATH}")
+            except OSError as save_error:
+                print(f"! Gagal menyimpan model bundle: {save_error}")
+        
+        # Output endpoint data bersifat deterministik, cukup dihitung sekali per model
+        install_models(new_model, new_dataset)
+        load_seconds = time.perf_counter() - load_start
+        metrics_registry.set('credit_model_load_seconds', load_seconds)
+        
+        print(f"✓ Credit risk models loaded successfully ({load_seconds:.2f}s)")
+        print(f"  - Version: {new_model.version}")
+        print(f"  - Clusters: {new_model.n_clusters}")
+        print(f"  - Features: {len(new_model.encoded_feature_columns)}")
+        print(f"  - Categorical columns: {new_model.categorical_cols}")
+        print(f"  - Dataset: {len(new_dataset)} rows, {new_dataset.nbytes / 1e6:.1f} MB")
         return True
     except Exception as e:
         print(f"✗ Error loading models: {e}")
@@ -93,41 +265,291 @@ def load_credit_models():
         traceback.print_exc()
         return False
 
-# Load models on startup
-load_credit_models()
+def reload_credit_models(blocking=True):
+    """load_credit_models di bawah model_file_lock.
+    
+    CSV dan bundle tidak dibaca di tengah admin update proses lain (CSV sudah
+    diganti tapi bundle belum), dan refit fallback tidak menimpa bundle hasil
+    partial_fit. Dengan blocking=False reload dilewati kalau lock sedang dipegang;
+    signature tetap beda sehingga dicoba lagi di pengecekan berikutnya.
+    """
+    with model_file_lock(blocking) as acquired:
+        if not acquired:
+            print("! Model sedang di-update proses lain - reload ditunda")
+            return False
+        return load_credit_models()
 
-# Ensure visualizations exist (generate on server if missing)
-def ensure_visualizations():
-    """Generate visualization images by running `generate_visualizations.py`
-    if any expected image is missing. This helps when images are not checked
-    into the repo (we intentionally ignore `static/img` locally).
+def reload_models_in_background():
+    """Reload model di thread terpisah; request tetap dilayani model lama sampai swap"""
+    if not model_reload_lock.acquire(blocking=False):
+        return  # reload lain sedang berjalan
+    
+    def run():
+        try:
+            reload_credit_models(blocking=False)
+        finally:
+            model_reload_lock.release()
+    
+    threading.Thread(target=run, name='model-reload', daemon=True).start()
+
+def check_model_updates():
+    """Hot reload: pakai model bundle baru yang ditulis worker lain / build offline"""
+    global last_reload_check
+    now = time.monotonic()
+    if now - last_reload_check < MODEL_RELOAD_INTERVAL:
+        return
+    last_reload_check = now
+    if bundle_signature() != loaded_bundle_signature:
+        reload_models_in_background()
+
+def apply_model_update(records):
+    """Tambah record berlabel baru: update model secara incremental lalu swap.
+    
+    Record di-append ke CSV (dengan label Cluster hasil assignment), model di-update
+    dengan partial_fit dalam O(record baru), lalu bundle disimpan supaya worker lain
+    ikut reload. Return ModelState baru.
+    
+    CSV baru ditulis ke file sementara lalu di-rename, jadi pembaca tidak pernah
+    melihat baris setengah tertulis.
     """
-    img_dir = os.path.join(os.path.dirname(__file__), 'static', 'img')
-    expected_files = [
-        os.path.join(img_dir, 'elbow_method.png'),
-        os.path.join(img_dir, 'pca_clusters.png'),
-        os.path.join(img_dir, 'cluster_heatmap.png'),
-        os.path.join(img_dir, 'cluster_profiles.png'),
-    ]
+    with model_file_lock():
+        # Pastikan mulai dari bundle terbaru (mungkin baru di-update worker lain)
+        if bundle_signature() != loaded_bundle_signature:
+            load_credit_models()
+        current_model, current_dataset = state.model, state.dataset
+        # pandas hanya untuk jalur update (append CSV), tidak di-import saat serving
+        import pandas as pd
+        
+        X, _ = current_model.encode_many(records)
+        loan_status = np.array([int(record['loan_status']) for record in records])
+        labels = current_model.assign(X)
+        
+        new_rows = pd.DataFrame(records)
+        # Schema menerima angka berupa string ("30"): simpan sebagai angka, bukan kategori
+        for col in current_model.feature_columns:
+            if col not in current_model.categorical_levels:
+                new_rows[col] = pd.to_numeric(new_rows[col])
+        new_rows['loan_status'] = loan_status
+        new_rows['Cluster'] = labels
+        new_rows = new_rows[list(current_dataset.columns)]
+        tmp_path = f"{CSV_PATH}.tmp-{os.getpid()}"
+        try:
+            shutil.copyfile(CSV_PATH, tmp_path)
+            new_rows.to_csv(tmp_path, mode='a', header=False, index=False)
+            os.replace(tmp_path, CSV_PATH)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        csv_sha256 = credit_model.file_sha256(CSV_PATH)
+        new_model, _ = current_model.partial_fit(X, loan_status, csv_sha256)
+        new_dataset = current_dataset.concat(CompactDataset.from_frame(new_rows))
+        new_dataset.save(DATASET_PATH, csv_sha256)
+        credit_model.save_bundle(new_model, MODEL_BUNDLE_PATH)
+        new_state = install_models(new_model, new_dataset)
+    
+    print(f"✓ Model updated: +{len(records)} records (version {new_model.version})")
+    return new_state
+
+def sample_data_payload(dataset):
+    """Sample data layak & tidak layak (deterministik: random_state=42)"""
+    # Filter approved (loan_status == 0) dan defaulted (loan_status == 1)
+    loan_status = dataset.columns['loan_status']
+    approved_mask = loan_status == 0
+    defaulted_mask = loan_status == 1
+    
+    # Sample 3 dari masing-masing
+    approved_samples = dataset.records(dataset.sample_rows(approved_mask, 3, random_state=42))
+    defaulted_samples = dataset.records(dataset.sample_rows(defaulted_mask, 3, random_state=42))
+    
+    return {
+        'success': True,
+        'approved': approved_samples,
+        'defaulted': defaulted_samples,
+        'approved_count': int(approved_mask.sum()),
+        'defaulted_count': int(defaulted_mask.sum()),
+        'total_count': len(dataset)
+    }
+
+def cluster_info_payload(model, dataset):
+    """Info semua clusters beserta persentase ukurannya"""
+    clusters_info = []
+    for cluster_id in sorted(model.cluster_stats.keys()):
+        info = model.cluster_stats[cluster_id]
+        clusters_info.append({
+            'id': cluster_id,
+            'default_rate': info['default_rate'],
+            'approval_rate': info['approval_rate'],
+            'size': info['size'],
+            'percentage': float(info['size'] / len(dataset) * 100)
+        })
+    
+    return {
+        'success': True,
+        'clusters': clusters_info,
+        'total_records': len(dataset)
+    }
+
+def build_cached_responses(model, dataset):
+    """Serialize payload endpoint data + ETag / Last-Modified.
+    
+    ETag dari hash body dan Last-Modified dari mtime file sumber, jadi nilainya
+    sama di semua worker dan berubah begitu model bundle / CSV berubah.
+    """
+    source_paths = [p for p in (CSV_PATH, MODEL_BUNDLE_PATH) if os.path.exists(p)]
+    last_modified = datetime.fromtimestamp(
+        max(os.path.getmtime(p) for p in source_paths), timezone.utc)
+    
+    responses = {}
+    payloads = {
+        'sample-data': sample_data_payload(dataset),
+        'cluster-info': cluster_info_payload(model, dataset),
+    }
+    for name, payload in payloads.items():
+        body = app.json.response(payload).get_data()
+        responses[name] = {
+            'body': body,
+            'etag': hashlib.sha256(body).hexdigest()[:32],
+            'last_modified': last_modified,
+        }
+    return responses
+
+def cached_json_response(cached_responses, name):
+    """Response dari cache, 304 kalau If-None-Match / If-Modified-Since cocok"""
+    cached = cached_responses[name]
+    response = app.response_class(cached['body'], mimetype='application/json')
+    response.set_etag(cached['etag'])
+    response.last_modified = cached['last_modified']
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['API_CACHE_MAX_AGE']
+    return response.make_conditional(request)
 
-    missing = [p for p in expected_files if not os.path.exists(p)]
-    if missing:
+# Load models on startup (menunggu admin update proses lain selesai kalau ada)
+reload_credit_models()
+
+# Gambar hasil generate_visualizations.py (relatif terhadap folder static)
+VISUALIZATION_FILES = [
+    'img/elbow_method.png',
+    'img/pca_clusters.png',
+    'img/cluster_heatmap.png',
+    'img/cluster_profiles.png',
+]
+VISUALIZATION_RETRY_AFTER = 30
+# Dipegang generator selama berjalan (satu generator untuk semua worker)
+VISUALIZATION_LOCK_PATH = os.path.join(os.path.dirname(__file__), '.cache', 'visualizations.lock')
+
+# Placeholder untuk <img> selama gambar belum selesai dibuat
+VISUALIZATION_PLACEHOLDER = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="800" height="500" viewBox="0 0 800 500">'
+    '<rect width="100%" height="100%" fill="#f3f4f6"/>'
+    '<text x="50%" y="50%" text-anchor="middle" font-family="sans-serif" font-size="24" fill="#6b7280">'
+    'Visualisasi sedang dibuat...</text></svg>'
+)
+
+visualization_job = None
+# pid proses yang menjalankan generator (hanya proses itu yang bisa poll() exit code-nya)
+visualization_job_parent = None
+# Generator sudah selesai tanpa membuat semua gambar (dicatat sekali per proses)
+visualization_failed = False
+
+def missing_visualizations():
+    """Daftar gambar visualisasi yang belum ada"""
+    return [name for name in VISUALIZATION_FILES
+            if not os.path.exists(os.path.join(app.static_folder, name))]
+
+def visualization_lock_held():
+    """True kalau ada generator (proses mana pun) yang sedang memegang lock visualisasi"""
+    if fcntl is None or not os.path.exists(VISUALIZATION_LOCK_PATH):
+        return False
+    with open(VISUALIZATION_LOCK_PATH, 'a') as lock_file:
         try:
-            script_path = os.path.join(os.path.dirname(__file__), 'generate_visualizations.py')
-            if os.path.exists(script_path):
-                # Run the generator with the same Python interpreter
-                subprocess.run([sys.executable, script_path], check=False)
-                print("✓ generate_visualizations.py executed (missing images regenerated)")
-            else:
-                print(f"! generate_visualizations.py not found at {script_path}")
-        except Exception as e:
-            print(f"Error generating visualizations: {e}")
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return False
+
+def visualizations_generating():
+    """True selama generator visualisasi masih berjalan.
+    
+    Proses yang menjalankan generator me-reap-nya lewat poll() (tidak jadi zombie);
+    worker hasil fork cukup cek pid-nya masih hidup. Generator yang keluar karena
+    proses lain sedang generate dianggap berjalan selama lock masih dipegang.
+    Kalau generator selesai tapi gambar tetap tidak ada, kegagalannya dicatat
+    sekali dan route gambar berhenti menyuruh client retry.
+    """
+    global visualization_failed
+    if visualization_job is None or visualization_failed:
+        return False
+    if visualization_job_parent == os.getpid():
+        returncode = visualization_job.poll()
+        running = returncode is None
+    else:
+        returncode = None
+        try:
+            os.kill(visualization_job.pid, 0)
+            running = True
+        except ProcessLookupError:
+            running = False
+        except PermissionError:
+            running = True
+    if running or visualization_lock_held():
+        return True
+    
+    missing = missing_visualizations()
+    if not missing:
+        return False
+    visualization_failed = True
+    status = f"exit code {returncode}" if returncode is not None else "proses sudah selesai"
+    print(f"✗ generate_visualizations.py gagal ({status}), gambar tetap tidak ada: {', '.join(missing)} "
+          f"(jalankan manual: python generate_visualizations.py --images-only)")
+    return False
 
-# Try to ensure visuals now (will run on import when Gunicorn loads the module)
+# Ensure visualizations exist (generate in background if missing)
+def ensure_visualizations():
+    """Start `generate_visualizations.py --images-only` di background kalau ada
+    gambar yang belum ada (static/img tidak selalu ikut ter-deploy).
+    
+    Tidak memblokir boot worker: proses generator berjalan terpisah dan file lock
+    memastikan hanya satu proses yang generate walaupun semua worker memanggil ini.
+    Selama generator berjalan, route gambar yang belum ada mengembalikan placeholder
+    503; kalau generator gagal, route gambar kembali 404.
+    """
+    global visualization_job, visualization_job_parent
+    if not missing_visualizations():
+        return
+    if os.environ.get('GENERATE_VISUALIZATIONS', '1') == '0':
+        print("! Visualisasi belum ada (jalankan: python generate_visualizations.py --images-only)")
+        return
+    
+    try:
+        script_path = os.path.join(os.path.dirname(__file__), 'generate_visualizations.py')
+        if os.path.exists(script_path):
+            # Run the generator with the same Python interpreter (non-blocking)
+            import subprocess
+            visualization_job = subprocess.Popen(
+                [sys.executable, script_path, '--images-only', '--lock', VISUALIZATION_LOCK_PATH])
+            visualization_job_parent = os.getpid()
+            print(f"✓ generate_visualizations.py started in background (pid {visualization_job.pid})")
+        else:
+            print(f"! generate_visualizations.py not found at {script_path}")
+    except Exception as e:
+        print(f"Error generating visualizations: {e}")
+
+def visualization_placeholder():
+    """Response 503 + Retry-After untuk gambar yang masih dibuat"""
+    response = app.response_class(VISUALIZATION_PLACEHOLDER, status=503, mimetype='image/svg+xml')
+    response.headers['Retry-After'] = str(VISUALIZATION_RETRY_AFTER)
+    response.cache_control.no_store = True
+    return response
+
+# Try to ensure visuals now (non-blocking, aman dipanggil saat Gunicorn load module)
 ensure_visualizations()
 
-# In-memory storage untuk demo
-contacts = []
+# Kiriman form kontak: SQLite (WAL) bersama semua worker, ditulis dari thread latar
+CONTACTS_DB_PATH = os.environ.get('CONTACTS_DB_PATH', os.path.join(os.path.dirname(__file__), 'data',
+                                                                   'contacts.sqlite'))
+contact_store = ContactStore(CONTACTS_DB_PATH, int(os.environ.get('CONTACTS_QUEUE_SIZE', 10000)))
 
 # ==================== ROUTES ====================
 
@@ -174,18 +596,24 @@ def contact():
                 'message': 'Semua field harus diisi'
             }), 400
         
-        # Simpan contact (demo)
+        # Simpan contact: masuk antrian, ditulis ke SQLite oleh thread latar
         contact_data = {
-            'id': len(contacts) + 1,
+            'id': uuid.uuid4().hex,
             'name': data.get('name'),
             'email': data.get('email'),
             'phone': data.get('phone', ''),
             'message': data.get('message'),
             'created_at': datetime.now().isoformat()
         }
-        contacts.append(contact_data)
+        try:
+            contact_store.add(dict(contact_data, contact_id=contact_data['id']))
+        except ContactStoreError:
+            return jsonify({
+                'success': False,
+                'message': 'Pesan belum bisa disimpan, coba lagi sebentar lagi'
+            }), 503
         
-        # Log ke console (production: simpan ke database)
+        # Log ke console
         print(f"New contact: {contact_data}")
         
         return jsonify({
@@ -206,7 +634,7 @@ def get_stats():
         'transactions': 2500000,
         'growth': 156,
         'satisfaction': 98,
-        'contacts_received': len(contacts)
+        'contacts_received': contact_store.count()
     }
     return jsonify(stats)
 
@@ -261,29 +689,89 @@ def get_testimonials():
 def get_sample_data():
     """API endpoint untuk sample data layak & tidak layak"""
     try:
-        if df_with_clusters is None:
+        current_state = state
+        if current_state is None or 'sample-data' not in current_state.cached_responses:
             return jsonify({'success': False, 'message': 'Data tidak tersedia'}), 500
         
-        # Filter approved (loan_status == 0) dan defaulted (loan_status == 1)
-        approved = df_with_clusters[df_with_clusters['loan_status'] == 0]
-        defaulted = df_with_clusters[df_with_clusters['loan_status'] == 1]
-        
-        # Sample 3 dari masing-masing
-        approved_samples = approved.sample(min(3, len(approved)), random_state=42).to_dict('records')
-        defaulted_samples = defaulted.sample(min(3, len(defaulted)), random_state=42).to_dict('records')
-        
-        return jsonify({
-            'success': True,
-            'approved': approved_samples,
-            'defaulted': defaulted_samples,
-            'approved_count': len(approved),
-            'defaulted_count': len(defaulted),
-            'total_count': len(df_with_clusters)
-        })
+        return cached_json_response(current_state.cached_responses, 'sample-data')
     except Exception as e:
         print(f"Error in get_sample_data: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def validation_error(errors):
+    """Response 400 dengan error terstruktur per field (message = error pertama)"""
+    return jsonify({
+        'success': False,
+        'message': errors[0]['message'],
+        'errors': errors
+    }), 400
+
+def build_prediction(model, nearest_cluster, min_distance, max_distance, soft=None):
+    """Susun hasil prediksi dari cluster terdekat dan jarak min/max ke centroid.
+    
+    soft (opsional) = (membership per cluster, expected default rate, flag OOD)
+    dari CreditModel.soft_assign.
+    """
+    # Get cluster statistics
+    cluster_info = model.cluster_stats.get(int(nearest_cluster), {})
+    default_rate = cluster_info.get('default_rate', 0)
+    approval_rate = cluster_info.get('approval_rate', 1)
+    cluster_size = cluster_info.get('size', 0)
+    
+    # Determine recommendation
+    recommendation, risk_level, color = credit_model.recommend(approval_rate)
+    
+    prediction = {
+        'cluster_id': int(nearest_cluster),
+        'distance_to_centroid': float(min_distance),
+        'default_rate': float(default_rate),
+        'approval_rate': float(approval_rate),
+        'cluster_size': int(cluster_size),
+        'recommendation': recommendation,
+        'risk_level': risk_level,
+        'color': color,
+        'confidence': float((1 - min_distance / max_distance) * 100) if max_distance > 0 else 0
+    }
+    if soft is not None:
+        probabilities, expected_default_rate, out_of_distribution = soft
+        prediction['membership'] = [float(p) for p in probabilities]
+        prediction['expected_default_rate'] = float(expected_default_rate)
+        prediction['out_of_distribution'] = bool(out_of_distribution)
+    return prediction
+
+def wants_membership():
+    """Query ?membership=1: tambahkan membership, expected default rate, dan flag OOD"""
+    return request.args.get('membership', '').lower() in ('1', 'true', 'yes')
+
+def neighbor_count(name, default=None):
+    """Parse query ?k= / ?knn= (1..MAX_NEIGHBORS); None kalau tidak diminta, ValueError kalau tidak valid"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    k = int(value)
+    if not 1 <= k <= app.config['MAX_NEIGHBORS']:
+        raise ValueError(k)
+    return k
+
+def neighbor_count_error(name):
+    return jsonify({
+        'success': False,
+        'message': f'Parameter {name} harus bilangan bulat 1..{app.config["MAX_NEIGHBORS"]}'
+    }), 400
+
+def knn_default_probability(dataset, rows):
+    """Proporsi default (loan_status = 1) di antara tetangga terdekat"""
+    return float(dataset.columns['loan_status'][rows].mean())
+
+def record_prediction_metrics(route, timer, cluster_counts):
+    """Catat durasi tiap tahap + jumlah assignment per cluster (dan simpan untuk Server-Timing)"""
+    for stage, seconds in timer.stages:
+        metrics_registry.observe('credit_predict_stage_seconds', seconds, (('route', route), ('stage', stage)))
+    for cluster_id, count in enumerate(cluster_counts):
+        if count:
+            metrics_registry.inc('credit_cluster_assignments_total', (('cluster', str(cluster_id)),), int(count))
+    g.server_timing = timer.stages
+
 @app.route('/api/predict', methods=['POST'])
 def predict_credit_risk():
     """
@@ -293,94 +781,383 @@ def predict_credit_risk():
     Output: JSON dengan prediksi cluster, default rate, dan rekomendasi
     """
     try:
-        if kmeans_model is None or scaler is None:
+        # Snapshot state untuk seluruh request (aman terhadap hot reload)
+        current_state = state
+        if current_state is None:
             return jsonify({
                 'success': False,
                 'message': 'Model belum dimuat'
             }), 500
+        current_model, current_schema = current_state.model, current_state.input_schema
+        current_dataset, current_index = current_state.dataset, current_state.neighbor_index
         
-        data = request.get_json()
+        timer = StageTimer()
+        data = request.get_json(silent=True)
+        timer.mark('parse')
         
-        # Validate input
+        # Validate input (tipe, level kategori, rentang) sebelum encoding
         if not data:
             return jsonify({
                 'success': False,
                 'message': 'Data input kosong'
             }), 400
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'message': 'Input harus berupa JSON object'
+            }), 400
+        errors = current_schema.validate(data)
+        if errors:
+            return validation_error(errors)
+        try:
+            knn = neighbor_count('knn')
+        except ValueError:
+            return neighbor_count_error('knn')
+        timer.mark('validate')
         
-        # Build feature vector
-        input_dict = {}
-        for col in feature_columns:
-            if col in data:
-                input_dict[col] = data[col]
-            else:
-                return jsonify({
-                    'success': False,
-                    'message': f'Field "{col}" diperlukan'
-                }), 400
+        # Payload identik (retry / re-submit) langsung dari cache tanpa encoding
+        include_membership = wants_membership()
+        variant = '+'.join(part for part in ('membership' if include_membership else '',
+                                             f'knn{knn}' if knn else '') if part)
+        cache_key = prediction_cache.key(current_model, data, variant)
+        prediction, cache_tier = prediction_cache.get(cache_key) if cache_key else (None, 'bypass')
+        metrics_registry.inc('credit_prediction_cache_total', (('result', cache_tier or 'miss'),))
+        timer.mark('cache')
         
-        # Convert ke DataFrame
-        input_df = pd.DataFrame([input_dict])
+        if prediction is None:
+            # Encode + standardize langsung ke NumPy (tanpa DataFrame)
+            input_vector = current_model.encode(data)
+            timer.mark('encode')
+            input_scaled = current_model.scale(input_vector)
+            timer.mark('scale')
+            
+            # Find nearest cluster (digabung dengan request lain yang bersamaan kalau aktif)
+            if g.pop('micro_batch_announced', False):
+                distances = micro_batcher.submit((current_model, input_scaled))
+            else:
+                distances = current_model.scaled_distances(input_scaled)
+            nearest_cluster = np.argmin(distances)
+            timer.mark('distance')
+            
+            soft = current_model.soft_assign(distances) if include_membership else None
+            prediction = build_prediction(current_model, nearest_cluster, distances[nearest_cluster],
+                                          np.max(distances), soft)
+            if knn:
+                # Default rate dari k applicant historis paling mirip, di samping hasil cluster
+                rows, _ = current_index.query(input_scaled, knn)
+                prediction['knn_k'] = len(rows)
+                prediction['knn_default_probability'] = knn_default_probability(current_dataset, rows)
+                timer.mark('neighbors')
+            if cache_key:
+                prediction_cache.put(cache_key, prediction, current_model.version)
+        if drift_monitor is not None:
+            drift_monitor.observe(data, prediction['cluster_id'])
+            timer.mark('drift')
         
-        # One-hot encode categorical variables
-        input_encoded = pd.get_dummies(input_df, columns=categorical_cols, drop_first=True)
+        result = {
+            'success': True,
+            'prediction': prediction,
+            'input': data,
+            'model_version': current_model.version
+        }
         
-        # Ensure all encoded columns exist
-        for col in encoded_feature_columns:
-            if col not in input_encoded.columns:
-                input_encoded[col] = 0
+        response = jsonify(result)
+        timer.mark('serialize')
+        cluster_counts = [0] * current_model.n_clusters
+        cluster_counts[prediction['cluster_id']] = 1
+        record_prediction_metrics('/api/predict', timer, cluster_counts)
+        return response, 200
+    
+    except Exception as e:
+        print(f"Error in predict_credit_risk: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
+@app.route('/api/neighbors', methods=['POST'])
+def find_neighbors():
+    """
+    API endpoint untuk k applicant historis paling mirip
+    
+    Input: JSON feature values seperti /api/predict, query ?k= (default 10)
+    Output: JSON dengan tetangga terdekat (record + jarak), proporsi default
+            di antara tetangga, dan prediksi cluster
+    """
+    try:
+        # Snapshot model + dataset + index untuk seluruh request (aman terhadap hot reload)
+        current_state = state
+        if current_state is None or current_state.neighbor_index is None:
+            return jsonify({
+                'success': False,
+                'message': 'Model belum dimuat'
+            }), 500
+        current_model, current_schema = current_state.model, current_state.input_schema
+        current_dataset, current_index = current_state.dataset, current_state.neighbor_index
+        if current_index.model_version != current_model.version:
+            return jsonify({
+                'success': False,
+                'message': 'Model sedang di-reload, coba lagi'
+            }), 503
         
-        # Reorder columns
-        input_encoded = input_encoded[encoded_feature_columns]
+        timer = StageTimer()
+        data = request.get_json(silent=True)
+        timer.mark('parse')
         
-        # Standardize
-        input_scaled = scaler.transform(input_encoded)
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': 'Data input kosong'
+            }), 400
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'message': 'Input harus berupa JSON object'
+            }), 400
+        errors = current_schema.validate(data)
+        if errors:
+            return validation_error(errors)
+        try:
+            k = neighbor_count('k', 10)
+        except ValueError:
+            return neighbor_count_error('k')
+        timer.mark('validate')
         
-        # Find nearest cluster
-        distances = np.linalg.norm(centroids - input_scaled[0], axis=1)
+        input_scaled = current_model.scale(current_model.encode(data))
+        timer.mark('scale')
+        distances = current_model.scaled_distances(input_scaled)
         nearest_cluster = np.argmin(distances)
-        min_distance = distances[nearest_cluster]
-        
-        # Get cluster statistics
-        cluster_info = cluster_stats.get(int(nearest_cluster), {})
-        default_rate = cluster_info.get('default_rate', 0)
-        approval_rate = cluster_info.get('approval_rate', 1)
-        cluster_size = cluster_info.get('size', 0)
-        
-        # Determine recommendation
-        if approval_rate >= 0.7:
-            recommendation = "LAYAK"
-            risk_level = "RENDAH"
-            color = "green"
-        elif approval_rate >= 0.5:
-            recommendation = "LAYAK (DENGAN PERTIMBANGAN)"
-            risk_level = "SEDANG"
-            color = "yellow"
-        else:
-            recommendation = "TIDAK LAYAK"
-            risk_level = "TINGGI"
-            color = "red"
+        timer.mark('distance')
+        rows, neighbor_distances = current_index.query(input_scaled, k)
+        timer.mark('neighbors')
         
-        result = {
+        neighbors = [
+            {'row': int(row), 'distance': float(distance), 'record': record}
+            for row, distance, record in zip(rows, neighbor_distances, current_dataset.records(rows))
+        ]
+        response = jsonify({
             'success': True,
-            'prediction': {
-                'cluster_id': int(nearest_cluster),
-                'distance_to_centroid': float(min_distance),
-                'default_rate': float(default_rate),
-                'approval_rate': float(approval_rate),
-                'cluster_size': int(cluster_size),
-                'recommendation': recommendation,
-                'risk_level': risk_level,
-                'color': color,
-                'confidence': float((1 - min_distance / np.max(distances)) * 100) if np.max(distances) > 0 else 0
-            },
-            'input': data
-        }
+            'k': len(neighbors),
+            'knn_default_probability': knn_default_probability(current_dataset, rows),
+            'neighbors': neighbors,
+            'prediction': build_prediction(current_model, nearest_cluster, distances[nearest_cluster],
+                                           np.max(distances)),
+            'model_version': current_model.version
+        })
+        timer.mark('serialize')
+        cluster_counts = [0] * current_model.n_clusters
+        cluster_counts[int(nearest_cluster)] = 1
+        record_prediction_metrics('/api/neighbors', timer, cluster_counts)
+        return response, 200
+    
+    except Exception as e:
+        print(f"Error in find_neighbors: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
+def parse_batch_payload():
+    """Parse body batch: JSON array atau NDJSON (satu applicant per baris).
+
+    Return list record; baris NDJSON yang bukan JSON valid disimpan sebagai
+    exception supaya bisa dilaporkan per baris.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/jsonlines'):
+        records = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(e)
+        return records
+    
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_credit_risk_batch():
+    """
+    API endpoint untuk prediksi banyak applicant sekaligus
+    
+    Input: JSON array (atau NDJSON) berisi feature values per applicant
+    Output: JSON dengan hasil per baris; baris yang tidak valid mendapat
+            pesan error tanpa menggagalkan seluruh batch
+    """
+    try:
+        # Snapshot state untuk seluruh request (aman terhadap hot reload)
+        current_state = state
+        if current_state is None:
+            return jsonify({
+                'success': False,
+                'message': 'Model belum dimuat'
+            }), 500
+        current_model, current_schema = current_state.model, current_state.input_schema
         
-        return jsonify(result), 200
+        timer = StageTimer()
+        records = parse_batch_payload()
+        timer.mark('parse')
+        if records is None:
+            return jsonify({
+                'success': False,
+                'message': 'Input harus berupa JSON array atau NDJSON'
+            }), 400
+        
+        if len(records) > app.config['MAX_BATCH_SIZE']:
+            return jsonify({
+                'success': False,
+                'message': f'Maksimal {app.config["MAX_BATCH_SIZE"]} applicant per batch'
+            }), 413
+        
+        # Validasi per baris sebelum encoding: bentuk record dulu, lalu schema per kolom (vectorized)
+        errors = {}
+        field_errors = {}
+        for i, record in enumerate(records):
+            if isinstance(record, Exception):
+                errors[i] = f'JSON tidak valid: {record}'
+            elif not isinstance(record, dict):
+                errors[i] = 'Applicant harus berupa JSON object'
+            elif not record:
+                errors[i] = 'Data input kosong'
+        candidate_index = [i for i in range(len(records)) if i not in errors]
+        for j, record_errors in current_schema.validate_many([records[i] for i in candidate_index]).items():
+            errors[candidate_index[j]] = record_errors[0]['message']
+            field_errors[candidate_index[j]] = record_errors
+        
+        valid_index = [i for i in candidate_index if i not in errors]
+        timer.mark('validate')
+        X, encode_errors = current_model.encode_many([records[i] for i in valid_index])
+        for j, message in encode_errors.items():
+            errors[valid_index[j]] = message
+        timer.mark('encode')
+        X_scaled = current_model.scale(X)
+        timer.mark('scale')
+        
+        # Semua jarak ke centroid dihitung sekaligus
+        distances = current_model.scaled_distances(X_scaled)
+        nearest = np.argmin(distances, axis=1)
+        min_distances = distances[np.arange(len(nearest)), nearest]
+        max_distances = np.max(distances, axis=1)
+        soft = current_model.soft_assign(distances) if wants_membership() else None
+        timer.mark('distance')
+        
+        results = [None] * len(records)
+        assigned = []
+        observed = []
+        for j, i in enumerate(valid_index):
+            if i not in errors:
+                assigned.append(int(nearest[j]))
+                observed.append(records[i])
+                results[i] = {
+                    'index': i,
+                    'success': True,
+                    'prediction': build_prediction(current_model, nearest[j], min_distances[j], max_distances[j],
+                                                   (soft[0][j], soft[1][j], soft[2][j]) if soft else None)
+                }
+        for i, message in errors.items():
+            results[i] = {'index': i, 'success': False, 'message': message}
+            if i in field_errors:
+                results[i]['errors'] = field_errors[i]
+        if drift_monitor is not None:
+            drift_monitor.observe_many(observed, assigned)
+            timer.mark('drift')
+        
+        response = jsonify({
+            'success': True,
+            'count': len(records),
+            'succeeded': len(records) - len(errors),
+            'failed': len(errors),
+            'results': results,
+            'model_version': current_model.version
+        })
+        timer.mark('serialize')
+        record_prediction_metrics('/api/predict/batch', timer,
+                                  np.bincount(assigned, minlength=current_model.n_clusters).tolist())
+        return response, 200
     
     except Exception as e:
-        print(f"Error in predict_credit_risk: {e}")
+        print(f"Error in predict_credit_risk_batch: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
+@app.route('/api/predict/what-if', methods=['POST'])
+def predict_what_if():
+    """
+    API endpoint untuk analisis what-if satu applicant
+    
+    Input: JSON {"applicant": {...feature values...},
+                 "grid": {field: {"values": [...]} atau {"min": a, "max": b, "steps": n}}}
+    Output: JSON dengan cluster di tiap titik grid, rekomendasi per cluster,
+            dan nilai field saat rekomendasi berubah (field lain tetap)
+    """
+    try:
+        # Snapshot state untuk seluruh request (aman terhadap hot reload)
+        current_state = state
+        if current_state is None:
+            return jsonify({
+                'success': False,
+                'message': 'Model belum dimuat'
+            }), 500
+        current_model, current_schema = current_state.model, current_state.input_schema
+        
+        timer = StageTimer()
+        data = request.get_json(silent=True)
+        timer.mark('parse')
+        
+        if not isinstance(data, dict) or not isinstance(data.get('applicant'), dict):
+            return jsonify({
+                'success': False,
+                'message': 'Input harus berupa JSON object {"applicant": {...}, "grid": {...}}'
+            }), 400
+        applicant = data['applicant']
+        errors = current_schema.validate(applicant)
+        if errors:
+            return validation_error(errors)
+        max_grid = app.config['WHAT_IF_MAX_GRID']
+        analysis, errors = WhatIfAnalysis.parse(current_model, current_schema, applicant,
+                                                data.get('grid'), max_grid)
+        if errors:
+            return validation_error(errors)
+        if analysis.size > max_grid:
+            return jsonify({
+                'success': False,
+                'message': f'Grid {analysis.size} titik, maksimal {max_grid} titik per request'
+            }), 413
+        timer.mark('validate')
+        
+        # Grid + garis per field + applicant di-score dalam satu pass
+        include_membership = wants_membership()
+        what_if, distances = analysis.run(include_membership)
+        timer.mark('distance')
+        nearest_cluster = np.argmin(distances)
+        soft = current_model.soft_assign(distances) if include_membership else None
+        
+        response = jsonify({
+            'success': True,
+            'prediction': build_prediction(current_model, nearest_cluster, distances[nearest_cluster],
+                                           np.max(distances), soft),
+            'what_if': what_if,
+            'model_version': current_model.version
+        })
+        timer.mark('serialize')
+        # Titik grid bukan applicant sungguhan: hanya applicant yang dihitung per cluster
+        cluster_counts = [0] * current_model.n_clusters
+        cluster_counts[int(nearest_cluster)] = 1
+        record_prediction_metrics('/api/predict/what-if', timer, cluster_counts)
+        return response, 200
+    
+    except Exception as e:
+        print(f"Error in predict_what_if: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({
@@ -392,28 +1169,121 @@ def predict_credit_risk():
 def get_cluster_info():
     """API endpoint untuk info semua clusters"""
     try:
-        if cluster_stats is None:
+        current_state = state
+        if current_state is None or 'cluster-info' not in current_state.cached_responses:
             return jsonify({'success': False, 'message': 'Data tidak tersedia'}), 500
         
-        clusters_info = []
-        for cluster_id in sorted(cluster_stats.keys()):
-            info = cluster_stats[cluster_id]
-            clusters_info.append({
-                'id': cluster_id,
-                'default_rate': info['default_rate'],
-                'approval_rate': info['approval_rate'],
-                'size': info['size'],
-                'percentage': float(info['size'] / len(df_with_clusters) * 100)
-            })
+        return cached_json_response(current_state.cached_responses, 'cluster-info')
+    except Exception as e:
+        print(f"Error in get_cluster_info: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/drift')
+def get_drift():
+    """
+    API endpoint untuk drift input traffic prediksi terhadap data training
+    
+    Output: JSON PSI / KL per field dan distribusi cluster (gabungan semua
+            worker sejak model aktif dimuat), dengan status per field
+    """
+    try:
+        if drift_monitor is None:
+            return jsonify({'success': False, 'message': 'Drift monitor nonaktif (DRIFT_MONITOR=0)'}), 503
+        if drift_monitor.baseline is None:
+            return jsonify({'success': False, 'message': 'Model belum dimuat'}), 500
+        
+        return jsonify({'success': True, **drift_monitor.report()})
+    except Exception as e:
+        print(f"Error in get_drift: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# ==================== ADMIN ENDPOINTS ====================
+
+def admin_error():
+    """Response error kalau request admin tidak diizinkan, atau None kalau boleh"""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({'success': False, 'message': 'Admin endpoint nonaktif (ADMIN_TOKEN belum diset)'}), 403
+    
+    supplied = request.headers.get('X-Admin-Token', '')
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        supplied = auth_header[len('Bearer '):]
+    if not hmac.compare_digest(supplied.encode(), admin_token.encode()):
+        return jsonify({'success': False, 'message': 'Token admin tidak valid'}), 401
+    return None
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload_models():
+    """Hot reload model bundle + CSV dari disk tanpa restart"""
+    error = admin_error()
+    if error:
+        return error
+    
+    if not reload_credit_models():
+        return jsonify({'success': False, 'message': 'Gagal reload model, model lama tetap dipakai'}), 500
+    
+    return jsonify({
+        'success': True,
+        'model_version': state.model.version,
+        'total_records': len(state.dataset)
+    }), 200
+
+@app.route('/api/admin/update', methods=['POST'])
+def admin_update_models():
+    """
+    Update model secara incremental dengan record berlabel baru
+    
+    Input: JSON array berisi feature values + loan_status (0/1) per record
+    Output: versi model baru dan statistik cluster terbaru
+    """
+    error = admin_error()
+    if error:
+        return error
+    
+    try:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list) or not records:
+            return jsonify({'success': False, 'message': 'Input harus berupa JSON array berisi record'}), 400
+        
+        # Data training harus bersih: tolak seluruh update kalau ada record yang tidak valid
+        current_schema = state.input_schema
+        errors = []
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors.append({'index': i, 'message': 'Record harus berupa JSON object'})
+                continue
+            record_errors = current_schema.validate(record)
+            if record_errors:
+                errors.append({'index': i, 'message': record_errors[0]['message'], 'errors': record_errors})
+            elif type(record.get('loan_status')) is not int or record['loan_status'] not in (0, 1):
+                # Bukan bool / float: true == 1 dan 1.0 == 1 tidak boleh lolos sebagai label
+                errors.append({'index': i, 'message': 'Field "loan_status" harus 0 atau 1'})
+        if errors:
+            return jsonify({'success': False, 'message': 'Record tidak valid', 'errors': errors}), 400
+        
+        new_state = apply_model_update(records)
         
         return jsonify({
             'success': True,
-            'clusters': clusters_info,
-            'total_records': len(df_with_clusters)
+            'added': len(records),
+            'model_version': new_state.model.version,
+            'clusters': cluster_info_payload(new_state.model, new_state.dataset)['clusters']
         }), 200
     except Exception as e:
-        print(f"Error in get_cluster_info: {e}")
-        return jsonify({'success': False, 'message': str(e)}), 500
+        print(f"Error in admin_update_models: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+# ==================== METRICS ====================
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Metrics format teks Prometheus (gabungan semua worker yang masih hidup)"""
+    metrics_registry.flush()
+    return app.response_class(metrics_registry.render(),
+                              content_type='text/plain; version=0.0.4; charset=utf-8')
 
 # ==================== ERROR HANDLERS ====================
 
@@ -429,8 +1299,19 @@ def internal_error(error):
 
 @app.before_request
 def before_request():
-    """Before request hook"""
-    pass
+    """Before request hook - hot reload model + placeholder gambar yang belum ada"""
+    g.request_start = time.perf_counter()
+    if micro_batcher is not None and request.endpoint == 'predict_credit_risk':
+        # Beri tahu leader micro-batch bahwa request ini akan ikut submit
+        micro_batcher.announce()
+        g.micro_batch_announced = True
+    if request.endpoint == 'static':
+        filename = (request.view_args or {}).get('filename')
+        if (filename in VISUALIZATION_FILES and filename in missing_visualizations()
+                and visualizations_generating()):
+            return visualization_placeholder()
+        return None
+    check_model_updates()
 
 @app.after_request
 def after_request(response):
@@ -438,11 +1319,36 @@ def after_request(response):
     response.headers['X-Content-Type-Options'] = 'nosniff'
     response.headers['X-Frame-Options'] = 'SAMEORIGIN'
     response.headers['X-XSS-Protection'] = '1; mode=block'
+    current_state = state
+    if current_state is not None:
+        response.headers['X-Model-Version'] = current_state.model.version
+    
+    # Metrics per route (pakai pola route, bukan path, supaya label tidak meledak)
+    if 'request_start' in g:
+        elapsed = time.perf_counter() - g.request_start
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics_registry.inc('credit_http_requests_total',
+                             (('route', route), ('method', request.method), ('status', str(response.status_code))))
+        metrics_registry.observe('credit_http_request_duration_seconds', elapsed, (('route', route),))
+        if app.config['SERVER_TIMING']:
+            timings = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in g.get('server_timing', ())]
+            timings.append(f"total;dur={elapsed * 1000:.3f}")
+            response.headers['Server-Timing'] = ', '.join(timings)
+        metrics_registry.ensure_flusher()
     return response
 
+@app.teardown_request
+def teardown_request(error=None):
+    """Request /api/predict yang selesai tanpa submit (error / cache hit) lepas dari micro-batch"""
+    if g.pop('micro_batch_announced', False):
+        micro_batcher.withdraw()
+
 # ==================== MAIN ====================
 
 if __name__ == '__main__':
+    # Server tunggal: snapshot yang tersisa milik proses dari run sebelumnya
+    for snapshot_dir in (METRICS_DIR, DRIFT_DIR):
+        clear_snapshots(snapshot_dir)
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_ENV', 'development') == 'development'
     app.run(
@@ -0,0 +1,287 @@
+"""
+Benchmark latency / throughput scoring API.
+
+Mengukur cold start (import app.py di proses baru), waktu load model,
+latency p50/p95/p99 /api/predict, throughput /api/predict/batch untuk
+beberapa ukuran batch, dan memory per worker. Applicant sintetis di-sample
+(seed tetap) dari credit_risk_dataset.csv. Semua server yang diukur (juga
+lewat load_test.py) berjalan dengan PREDICTION_CACHE_SIZE=0 supaya latency
+tidak berasal dari cache hit. Hasil ditulis sebagai JSON yang bisa
+dibandingkan dengan baseline tersimpan.
+
+Contoh:
+    python benchmarks/bench_api.py --output bench.json
+    python benchmarks/bench_api.py --gunicorn --workers 2 --compare benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import statistics
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Environment server saat benchmark: cache prediksi dimatikan supaya latency
+# /api/predict mengukur scoring (payload berulang / warm-up tidak jadi cache hit)
+BENCH_ENV = {'GENERATE_VISUALIZATIONS': '0', 'PREDICTION_CACHE_SIZE': '0'}
+
+import numpy as np
+import pandas as pd
+
+DATASET_PATH = os.path.join(ROOT_DIR, 'credit_risk_dataset.csv')
+
+
+def synthetic_applicants(n, seed=42):
+    """Sample applicant (dengan pengembalian) dari dataset, tanpa loan_status"""
+    df = pd.read_csv(DATASET_PATH).dropna()
+    rows = df.sample(n, replace=True, random_state=seed).drop(columns=['loan_status'])
+    return json.loads(rows.to_json(orient='records'))
+
+
+def percentiles(samples_ms):
+    samples = np.asarray(samples_ms)
+    return {
+        'mean': float(samples.mean()),
+        'p50': float(np.percentile(samples, 50)),
+        'p95': float(np.percentile(samples, 95)),
+        'p99': float(np.percentile(samples, 99)),
+    }
+
+
+def process_memory_mb(pid='self'):
+    """RSS / PSS / private memory (MB) sebuah proses dari /proc (Linux)"""
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    name = 'private' if key.startswith('Private') else key.lower()
+                    usage[name] = usage.get(name, 0) + int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return usage
+
+
+def bench_cold_start(repeats):
+    """Waktu import app.py di interpreter baru (termasuk load model)"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT_DIR, check=True,
+                       stdout=subprocess.DEVNULL, env={**os.environ, **BENCH_ENV})
+        timings.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'runs': repeats}
+
+
+def bench_in_process(n_requests, batch_sizes):
+    """Benchmark dengan Flask test client (tanpa network)"""
+    os.environ.update(BENCH_ENV)
+    import app as app_module
+
+    results = {'model_version': app_module.state.model.version}
+
+    start = time.perf_counter()
+    app_module.load_credit_models()
+    results['model_load_s'] = time.perf_counter() - start
+
+    client = app_module.app.test_client()
+    applicants = synthetic_applicants(max(n_requests, max(batch_sizes)) + 50)
+
+    # Warm-up dengan payload terpisah dari payload yang diukur
+    for applicant in applicants[-50:]:
+        client.post('/api/predict', json=applicant)
+
+    latencies = []
+    for applicant in applicants[:n_requests]:
+        start = time.perf_counter()
+        response = client.post('/api/predict', json=applicant)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    results['predict_latency_ms'] = percentiles(latencies)
+    results['predict_rps'] = n_requests / (sum(latencies) / 1000)
+
+    results['batch'] = {}
+    for size in batch_sizes:
+        payload = applicants[:size]
+        repeats = max(3, min(50, 20000 // size))
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = client.post('/api/predict/batch', json=payload)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        median_s = statistics.median(timings)
+        results['batch'][str(size)] = {'latency_ms': median_s * 1000, 'rows_per_sec': size / median_s}
+
+    results['memory_mb'] = process_memory_mb()
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _child_pids(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        children.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return children
+
+
+def bench_gunicorn(workers, n_requests, concurrency, extra_args=(), env=None, during=None):
+    """Jalankan gunicorn lokal (config repo) lalu ukur latency lewat HTTP.
+
+    env menambah / mengganti environment server; during(base_url) dipanggil
+    (mis. untuk menjalankan client lambat) tepat sebelum load dimulai dan
+    return callable yang dipanggil setelah load selesai.
+    """
+    port = _free_port()
+    command = [sys.executable, '-m', 'gunicorn', 'app:app', '--config', 'gunicorn.conf.py',
+               '--bind', f'127.0.0.1:{port}', '--workers', str(workers), *extra_args]
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              env={**os.environ, **BENCH_ENV, **(env or {})})
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f'{base_url}/api/stats', timeout=1).read()
+                break
+            except OSError:
+                if server.poll() is not None or time.perf_counter() - start > 120:
+                    raise RuntimeError('gunicorn gagal start')
+                time.sleep(0.05)
+        ready_s = time.perf_counter() - start
+
+        applicants = synthetic_applicants(n_requests, seed=7)
+
+        def post(applicant):
+            body = json.dumps(applicant).encode('utf-8')
+            req = urllib.request.Request(f'{base_url}/api/predict', data=body,
+                                         headers={'Content-Type': 'application/json'})
+            t0 = time.perf_counter()
+            urllib.request.urlopen(req, timeout=30).read()
+            return (time.perf_counter() - t0) * 1000
+
+        stop_background = during(base_url) if during else None
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(post, applicants))
+        wall_s = time.perf_counter() - wall_start
+        if stop_background:
+            stop_background()
+
+        worker_memory = {str(pid): process_memory_mb(pid) for pid in _child_pids(server.pid)}
+        return {
+            'workers': workers,
+            'concurrency': concurrency,
+            'ready_s': ready_s,
+            'predict_latency_ms': percentiles(latencies),
+            'throughput_rps': n_requests / wall_s,
+            'master_memory_mb': process_memory_mb(server.pid),
+            'worker_memory_mb': worker_memory,
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _flatten(data, prefix=''):
+    flat = {}
+    for key, value in data.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Cetak perubahan tiap metrik terhadap baseline; return jumlah regresi"""
+    current = _flatten(results['results'])
+    previous = _flatten(baseline['results'])
+    regressions = 0
+    print(f"\n{'metric':<55} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(set(current) & set(previous)):
+        if 'worker_memory_mb.' in name or previous[name] == 0:
+            continue  # pid worker berbeda tiap run
+        change = (current[name] - previous[name]) / abs(previous[name])
+        # Untuk throughput makin besar makin baik, selain itu makin kecil makin baik
+        higher_is_better = name.endswith(('rows_per_sec', 'rps'))
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        regressions += regressed
+        flag = '  REGRESI' if regressed else ''
+        print(f"{name:<55} {previous[name]:>12.4g} {current[name]:>12.4g} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark scoring API')
+    parser.add_argument('--requests', type=int, default=2000, help='Jumlah request /api/predict')
+    parser.add_argument('--batch-sizes', default='1,10,100,1000', help='Ukuran batch, pisahkan koma')
+    parser.add_argument('--cold-start-runs', type=int, default=3)
+    parser.add_argument('--gunicorn', action='store_true', help='Juga benchmark gunicorn lokal')
+    parser.add_argument('--workers', type=int, default=2, help='Worker gunicorn')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client paralel untuk gunicorn')
+    parser.add_argument('--output', help='Tulis hasil JSON ke file ini')
+    parser.add_argument('--compare', help='Baseline JSON untuk dibandingkan')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Batas regresi relatif')
+    args = parser.parse_args(argv)
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    results = {
+        'cold_start': bench_cold_start(args.cold_start_runs),
+        'in_process': bench_in_process(args.requests, batch_sizes),
+    }
+    if args.gunicorn:
+        results['gunicorn'] = bench_gunicorn(args.workers, args.requests, args.concurrency)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"✓ Hasil benchmark: {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n✗ {regressions} metrik regresi > {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\n✓ Tidak ada regresi")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Laporan mode scoring: float64 penuh vs CompactScorer (float32 / fitur dipangkas).
+
+Untuk tiap konfigurasi dihitung agreement assignment dengan float64 penuh di
+seluruh dataset tersimpan, error jarak maksimum, waktu scoring satu matrix
+(semua baris dataset) dan satu vektor. Pakai hasilnya untuk memilih
+SCORING_PRECISION / SCORING_PRUNE_TOLERANCE: app hanya memakai mode yang
+agreement-nya >= SCORING_MIN_AGREEMENT (default 100%).
+
+Contoh:
+    python benchmarks/bench_scoring.py
+    python benchmarks/bench_scoring.py --tolerances 0.05,0.1,0.25 --output scoring.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+
+import credit_model
+from credit_dataset import load_dataset
+
+
+def best_time(fn, repeats):
+    """Waktu tercepat dari beberapa run (detik)"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Agreement + kecepatan mode scoring')
+    parser.add_argument('--csv', default=credit_model.DEFAULT_CSV_PATH)
+    parser.add_argument('--bundle', default=credit_model.DEFAULT_BUNDLE_PATH)
+    parser.add_argument('--tolerances', default='0.05,0.1,0.25,0.5',
+                        help='Toleransi pemangkasan fitur (satuan std), pisahkan koma')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--output', help='Tulis hasil JSON ke file ini')
+    args = parser.parse_args(argv)
+
+    dataset, _ = load_dataset(args.csv)
+    model = credit_model.load_bundle(args.bundle)
+    X_scaled = model.scale(model.encode_columns(dataset))
+    full = model.full_distances(X_scaled)
+
+    configs = [('float64 (penuh)', None)]
+    configs += [(f'{dtype}', credit_model.CompactScorer(model.centroids, dtype)) for dtype in ('float64', 'float32')]
+    configs += [(f'float32 prune {tolerance:g}', credit_model.CompactScorer(model.centroids, 'float32', tolerance))
+                for tolerance in map(float, args.tolerances.split(','))]
+
+    results = {}
+    for name, scorer in configs:
+        distances_fn = model.full_distances if scorer is None else scorer.distances
+        distances = distances_fn(X_scaled)
+        results[name] = {
+            'agreement': 1.0 if scorer is None else model.scorer_agreement(scorer, X_scaled),
+            'max_distance_error': float(np.abs(distances - full).max()),
+            'pruned_features': [] if scorer is None else scorer.describe(model.encoded_feature_columns)['pruned_features'],
+            'matrix_ms': best_time(lambda: distances_fn(X_scaled), args.repeats) * 1000,
+            'vector_us': best_time(lambda: [distances_fn(x) for x in X_scaled[:1000]], args.repeats) * 1000,
+        }
+
+    print(f"{len(X_scaled)} baris, {X_scaled.shape[1]} fitur\n")
+    print(f"{'mode':<22} {'agreement':>10} {'max err':>10} {'pruned':>7} {'matrix ms':>10} {'vector us':>10}")
+    for name, result in results.items():
+        print(f"{name:<22} {result['agreement']:>10.4%} {result['max_distance_error']:>10.2e} "
+              f"{len(result['pruned_features']):>7} {result['matrix_ms']:>10.2f} {result['vector_us']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, sort_keys=True)
+        print(f"✓ Hasil laporan scoring: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Laporan waktu startup worker: ringkasan `python -X importtime -c "import app"`.
+
+Import dijalankan di proses Python baru (cache modul kosong) beberapa kali;
+dilaporkan total waktu import app, wall clock proses, modul dengan waktu
+import kumulatif terbesar, dan apakah modul berat (pandas, scikit-learn,
+scipy, matplotlib) ikut ter-import. Jalur serving seharusnya cukup NumPy +
+Flask; --strict keluar dengan kode 1 kalau ada modul berat yang ter-import.
+
+Contoh:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module credit_model --strict --output startup.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy', 'matplotlib', 'seaborn')
+
+
+def parse_importtime(stderr):
+    """{modul: (self_us, cumulative_us)} dari output -X importtime"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def run_import(module, env):
+    """Import modul di interpreter baru; return (wall_ms, timings)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} gagal:\n{result.stderr[-2000:]}")
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ringkasan waktu import (startup worker)')
+    parser.add_argument('--module', default='app', help='Modul yang di-import (default: app)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Jumlah modul terlama yang ditampilkan')
+    parser.add_argument('--strict', action='store_true', help='Exit 1 kalau modul berat ikut ter-import')
+    parser.add_argument('--output', help='Tulis hasil JSON ke file ini')
+    args = parser.parse_args(argv)
+
+    # Sama seperti worker gunicorn, tapi tanpa memicu generate visualisasi
+    env = dict(os.environ, GENERATE_VISUALIZATIONS='0', PYTHONDONTWRITEBYTECODE='1')
+
+    runs = [run_import(args.module, env) for _ in range(args.repeats)]
+    # Run dengan total import tercepat (paling sedikit noise) sebagai acuan rincian
+    wall_ms, timings = min(runs, key=lambda run: run[1][args.module][1])
+    import_ms = timings[args.module][1] / 1000
+    heavy = sorted({name.split('.')[0] for name in timings} & set(HEAVY_MODULES))
+
+    # Hanya modul top-level (tanpa titik) supaya sub-modul tidak dihitung dobel
+    top_level = sorted(((name, cumulative) for name, (_, cumulative) in timings.items() if '.' not in name),
+                       key=lambda item: item[1], reverse=True)
+
+    print(f"import {args.module}: {import_ms:.1f} ms (min dari {args.repeats} run), "
+          f"wall clock proses {min(run[0] for run in runs):.1f} ms, {len(timings)} modul\n")
+    print(f"{'modul':<32} {'kumulatif ms':>12}")
+    for name, cumulative in top_level[:args.top]:
+        print(f"{name:<32} {cumulative / 1000:>12.1f}")
+    print()
+    if heavy:
+        print(f"✗ Modul berat ikut ter-import: {', '.join(heavy)}")
+    else:
+        print("✓ Tidak ada modul berat (serving cukup NumPy + Flask)")
+
+    if args.output:
+        report = {
+            'args': vars(args),
+            'import_ms': import_ms,
+            'import_ms_runs': [run[1][args.module][1] / 1000 for run in runs],
+            'wall_ms_runs': [run[0] for run in runs],
+            'module_count': len(timings),
+            'heavy_modules': heavy,
+            'top_modules': [{'module': name, 'cumulative_ms': cumulative / 1000}
+                            for name, cumulative in top_level[:args.top]],
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"✓ Hasil laporan startup: {args.output}")
+
+    if args.strict and heavy:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Load test: setup Procfile (worker sync) vs mode high-concurrency (gthread).
+
+Menjalankan gunicorn lokal dengan beberapa konfigurasi lalu mengirim banyak
+request /api/predict bersamaan. Opsional ada client lambat yang membuka
+koneksi dan mengirim body sedikit demi sedikit (seperti client mobile di
+jaringan buruk) untuk menunjukkan efek satu client lambat terhadap worker.
+
+Contoh:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --workers 2 --threads 8 --concurrency 32 --slow-clients 2
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_api import bench_gunicorn, synthetic_applicants
+
+
+def slow_clients(count, interval):
+    """Buat callable during(base_url): client yang mengirim body 1 byte per interval"""
+    def during(base_url):
+        host, port = base_url.rsplit('//', 1)[1].split(':')
+        body = json.dumps(synthetic_applicants(1, seed=1)[0]).encode('utf-8')
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                try:
+                    with socket.create_connection((host, int(port)), timeout=10) as sock:
+                        sock.sendall(b'POST /api/predict HTTP/1.1\r\nHost: localhost\r\n'
+                                     b'Content-Type: application/json\r\n'
+                                     b'Content-Length: %d\r\n\r\n' % len(body))
+                        for i in range(len(body)):
+                            if stop.wait(interval):
+                                return
+                            sock.sendall(body[i:i + 1])
+                        sock.recv(65536)
+                except OSError:
+                    time.sleep(interval)
+
+        threads = [threading.Thread(target=run, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        time.sleep(interval * 2)  # pastikan koneksi lambat sudah menempel ke worker
+
+        def finish():
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+        return finish
+    return during
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test mode serving gunicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help='Thread per worker di mode gthread')
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=32, help='Client paralel')
+    parser.add_argument('--slow-clients', type=int, default=0, help='Jumlah client lambat')
+    parser.add_argument('--slow-interval', type=float, default=0.05, help='Detik per byte client lambat')
+    parser.add_argument('--output', help='Tulis hasil JSON ke file ini')
+    args = parser.parse_args(argv)
+
+    during = slow_clients(args.slow_clients, args.slow_interval) if args.slow_clients else None
+    configs = [
+        ('procfile (sync)', {}),
+        (f'gthread x{args.threads}', {'GUNICORN_THREADS': str(args.threads), 'PREDICT_MICRO_BATCH_MS': '0'}),
+        (f'gthread x{args.threads} + micro-batch', {'GUNICORN_THREADS': str(args.threads),
+                                                    'PREDICT_MICRO_BATCH_MS': '2'}),
+    ]
+
+    results = {}
+    for name, env in configs:
+        print(f"… {name}")
+        results[name] = bench_gunicorn(args.workers, args.requests, args.concurrency,
+                                       env={**env, 'METRICS_DIR': ''}, during=during)
+
+    baseline = results[configs[0][0]]['throughput_rps']
+    print(f"\n{'mode':<32} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'vs procfile':>12}")
+    for name, result in results.items():
+        latency = result['predict_latency_ms']
+        print(f"{name:<32} {result['throughput_rps']:>9.0f} {latency['p50']:>9.2f} {latency['p99']:>9.2f} "
+              f"{result['throughput_rps'] / baseline:>11.2f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, sort_keys=True)
+        print(f"✓ Hasil load test: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
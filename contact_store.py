@@ -0,0 +1,140 @@
+"""
+Penyimpanan kiriman form kontak: append-only di SQLite (WAL).
+
+Request cukup memasukkan record ke antrian; thread latar mengambil semua
+record yang sedang antri lalu menulisnya dalam satu transaksi, sehingga
+latency POST tidak ikut naik saat banyak kiriman datang bersamaan. File
+SQLite dibagi semua worker gunicorn, jadi jumlah kontak sama di worker mana
+pun (selisih paling lama satu batch tulis) dan tidak hilang saat restart.
+"""
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+
+from sqlite_local import LocalConnection
+
+# Maksimal record per transaksi tulis
+WRITE_BATCH_SIZE = 500
+# Jeda sebelum mencoba ulang tulis yang gagal (detik, naik sampai batas)
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 5.0
+
+COLUMNS = ('contact_id', 'name', 'email', 'phone', 'message', 'created_at')
+SCHEMA = ('CREATE TABLE IF NOT EXISTS contacts ('
+          'id INTEGER PRIMARY KEY, contact_id TEXT, name TEXT, email TEXT, '
+          'phone TEXT, message TEXT, created_at TEXT)')
+
+
+class ContactStoreError(Exception):
+    """Kontak tidak bisa disimpan (antrian penuh dan tulis langsung ke SQLite gagal)"""
+
+
+class ContactStore:
+    """Antrian tulis + thread writer per proses di atas satu file SQLite"""
+
+    def __init__(self, path, max_queue=10000):
+        self.path = path
+        self.max_queue = max_queue
+        self._db = LocalConnection(path, SCHEMA, timeout=5.0)
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+        # Writer adalah daemon thread: tulis sisa antrian sebelum proses keluar
+        atexit.register(self.flush)
+
+    def _reset(self):
+        """State per proses (dipanggil lagi di worker hasil fork)"""
+        self._queue = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_total = 0
+        self._writer = None
+        self._writer_pid = None
+
+    def _ensure_writer(self):
+        if self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid != os.getpid():
+                self._writer = threading.Thread(target=self._run, name='contact-writer', daemon=True)
+                self._writer.start()
+                self._writer_pid = os.getpid()
+
+    def add(self, contact):
+        """Antrikan satu kontak (dict dengan COLUMNS); ditulis oleh thread latar.
+
+        Raise ContactStoreError kalau antrian penuh dan tulis langsung gagal.
+        """
+        self._ensure_writer()
+        row = tuple(contact.get(column) for column in COLUMNS)
+        with self._lock:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Antrian penuh (disk lambat / macet): tulis langsung sebagai backpressure
+            try:
+                self._write([row])
+            except (sqlite3.Error, OSError) as e:
+                print(f"! Gagal menyimpan kontak (antrian penuh): {e}")
+                raise ContactStoreError(str(e)) from e
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+    def count(self):
+        """Jumlah kontak tersimpan (semua worker) + yang masih antri di proses ini"""
+        # Append-only: rowid terbesar = jumlah baris, tanpa scan tabel
+        try:
+            total = self._db.connection().execute('SELECT COALESCE(MAX(id), 0) FROM contacts').fetchone()[0]
+            self._last_total = total
+        except (sqlite3.Error, OSError) as e:
+            print(f"! Gagal membaca jumlah kontak: {e}")
+            total = self._last_total
+        with self._lock:
+            return total + self._pending
+
+    def flush(self, timeout=5.0):
+        """Tunggu sampai antrian proses ini tertulis (untuk shutdown / test)"""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._pending == 0
+
+    def _write(self, rows):
+        conn = self._db.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(f"INSERT INTO contacts ({', '.join(COLUMNS)}) "
+                             f"VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+            conn.execute('COMMIT')
+        except BaseException:
+            try:
+                conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            raise
+
+    def _run(self):
+        delay = RETRY_DELAY
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            while True:
+                try:
+                    self._write(batch)
+                    delay = RETRY_DELAY
+                    break
+                except (sqlite3.Error, OSError) as e:
+                    print(f"! Gagal menyimpan {len(batch)} kontak ({e}) - coba lagi {delay:.1f}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+            with self._lock:
+                self._pending -= len(batch)
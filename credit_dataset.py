@@ -0,0 +1,254 @@
+"""
+Dataset credit risk dalam bentuk kolom NumPy yang ringkas.
+
+Kolom numeric disimpan sebagai array NumPy (integer di-downcast ke tipe
+terkecil yang muat), kolom kategori sebagai kode int8 + daftar level. Tidak
+ada object Python per baris, sehingga dengan gunicorn --preload buffer array
+tetap dibagi (copy-on-write) antar worker dan tidak ikut tersalin karena
+perubahan refcount.
+
+Dataset bisa disimpan sebagai .npz kolumnar (kode kategori + tipe yang sudah
+di-downcast) sehingga startup tidak perlu parse CSV; CSV hanya sumber import.
+Konversi manual:
+    python credit_dataset.py [--csv credit_risk_with_clusters.csv] [--output models/credit_risk_with_clusters.npz]
+"""
+import os
+import json
+import hashlib
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(BASE_DIR, 'models')
+
+# Naikkan kalau layout .npz berubah, file lama otomatis dianggap basi
+DATASET_FORMAT_VERSION = 1
+
+
+class DatasetError(Exception):
+    """File dataset .npz tidak ada, rusak, atau basi terhadap CSV sumber"""
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hitung sha256 sebuah file secara streaming"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_dataset_path(csv_path):
+    """models/<nama CSV>.npz"""
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(DATASET_DIR, f'{name}.npz')
+
+
+def _downcast_int(values):
+    """Integer ke tipe terkecil yang bisa menampung semua nilainya"""
+    if len(values) == 0:
+        return values.astype(np.int8)
+    lo, hi = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(dtype)
+    return values.astype(np.int64)
+
+
+def _downcast_float(values):
+    """Float ke float32 hanya kalau semua nilainya tetap sama persis (mis. 3.0, NaN)"""
+    values = np.asarray(values, dtype=np.float64)
+    narrow = values.astype(np.float32)
+    if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+        return narrow
+    return values
+
+
+class CompactDataset:
+    """Kolom-kolom dataset sebagai array NumPy (kategori sebagai kode int8)"""
+
+    def __init__(self, columns, levels):
+        # columns: nama -> array (urutan kolom sama dengan CSV)
+        # levels: nama kolom kategori -> list level (kode -1 = kosong)
+        self.columns = columns
+        self.levels = levels
+        for array in self.columns.values():
+            array.flags.writeable = False
+
+    @classmethod
+    def from_frame(cls, df):
+        """Buat dari DataFrame hasil pd.read_csv"""
+        columns = {}
+        levels = {}
+        for name in df.columns:
+            series = df[name]
+            if series.dtype == object:
+                codes, uniques = series.factorize(sort=True)
+                columns[name] = codes.astype(np.int8 if len(uniques) < 128 else np.int16)
+                levels[name] = uniques.tolist()
+            elif np.issubdtype(series.dtype, np.integer):
+                columns[name] = _downcast_int(series.to_numpy())
+            else:
+                # float32 hanya kalau lossless supaya nilai yang dikembalikan API tidak berubah
+                columns[name] = _downcast_float(series.to_numpy(dtype=np.float64))
+        return cls(columns, levels)
+
+    def concat(self, other):
+        """Dataset baru berisi baris self diikuti baris other (kolom sama).
+
+        Raise DatasetError kalau satu kolom berupa angka di satu dataset dan
+        kategori di dataset lain (mis. angka yang terkirim sebagai string).
+        """
+        columns = {}
+        levels = {}
+        for name, array in self.columns.items():
+            if (name in self.levels) != (name in other.levels):
+                raise DatasetError(f"Kolom {name} berupa angka di satu dataset dan kategori di dataset lain")
+            if name in self.levels:
+                # Gabungkan level lalu petakan ulang kode kedua dataset
+                merged = sorted(set(self.levels[name]) | set(other.levels.get(name, [])))
+                lookup = {level: code for code, level in enumerate(merged)}
+                dtype = np.int8 if len(merged) < 128 else np.int16
+                parts = []
+                for part in (self, other):
+                    remap = np.array([lookup[level] for level in part.levels.get(name, [])] + [-1],
+                                     dtype=dtype)
+                    parts.append(remap[part.columns[name]])
+                columns[name] = np.concatenate(parts)
+                levels[name] = merged
+            else:
+                extra = other.columns[name]
+                if (np.issubdtype(array.dtype, np.integer) and not np.issubdtype(extra.dtype, np.integer)
+                        and np.all(np.isfinite(extra)) and np.all(extra == np.round(extra))):
+                    # Mis. 22.0 dari JSON untuk kolom integer: tetap simpan sebagai integer
+                    extra = extra.astype(np.int64)
+                combined = np.concatenate([array, extra])
+                columns[name] = (_downcast_int(combined) if np.issubdtype(combined.dtype, np.integer)
+                                 else _downcast_float(combined))
+        return CompactDataset(columns, levels)
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        """Import dari CSV (pandas hanya dibutuhkan di sini)"""
+        import pandas as pd
+        return cls.from_frame(pd.read_csv(csv_path))
+
+    def save(self, path, source_sha256=None):
+        """Simpan ke .npz kolumnar secara atomic (tulis tmp lalu rename)"""
+        meta = {
+            'format_version': DATASET_FORMAT_VERSION,
+            'source_sha256': source_sha256,
+            'columns': list(self.columns),
+            'levels': self.levels,
+        }
+        arrays = {f'column_{i}': array for i, array in enumerate(self.columns.values())}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, expected_sha256=None):
+        """Muat dari .npz; raise DatasetError kalau tidak valid atau basi"""
+        if not os.path.exists(path):
+            raise DatasetError(f"Dataset tidak ditemukan: {path}")
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('format_version') != DATASET_FORMAT_VERSION:
+                    raise DatasetError(
+                        f"Format dataset v{meta.get('format_version')} != v{DATASET_FORMAT_VERSION}")
+                if expected_sha256 is not None and meta.get('source_sha256') != expected_sha256:
+                    raise DatasetError("Dataset basi (CSV sumber sudah berubah)")
+                columns = {name: data[f'column_{i}'] for i, name in enumerate(meta['columns'])}
+        except (OSError, KeyError, ValueError) as e:
+            raise DatasetError(f"Dataset tidak bisa dibaca: {e}") from e
+        return cls(columns, meta['levels'])
+
+    def to_frame(self):
+        """DataFrame dengan tipe seperti pd.read_csv (int64 / float64 / object)"""
+        import pandas as pd
+        return pd.DataFrame({
+            name: self[name] if name in self.levels else
+            array.astype(np.int64 if np.issubdtype(array.dtype, np.integer) else np.float64)
+            for name, array in self.columns.items()
+        })
+
+    def __getitem__(self, name):
+        """Array satu kolom; kategori di-decode ke object array (kosong = NaN)"""
+        array = self.columns[name]
+        if name in self.levels:
+            return np.asarray(self.levels[name] + [np.nan], dtype=object)[array]
+        return array
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.columns.values())
+
+    def values(self, name, rows=None):
+        """Nilai satu kolom sebagai list Python (kategori di-decode ke string)"""
+        array = self.columns[name] if rows is None else self.columns[name][rows]
+        if name in self.levels:
+            levels = self.levels[name]
+            return [levels[code] if code >= 0 else float('nan') for code in array.tolist()]
+        return array.tolist()
+
+    def records(self, rows):
+        """Baris terpilih sebagai list dict (setara DataFrame.to_dict('records'))"""
+        rows = np.asarray(rows)
+        values = {name: self.values(name, rows) for name in self.columns}
+        return [{name: values[name][i] for name in self.columns} for i in range(len(rows))]
+
+    def sample_rows(self, mask, n, random_state=42):
+        """Index baris acak dari baris yang memenuhi mask.
+
+        Sama dengan DataFrame[mask].sample(n, random_state=...) di pandas.
+        """
+        candidates = np.flatnonzero(mask)
+        n = min(n, len(candidates))
+        picked = np.random.RandomState(random_state).choice(len(candidates), size=n, replace=False)
+        return candidates[picked]
+
+
+def load_dataset(csv_path, dataset_path=None, csv_sha256=None):
+    """Muat dataset .npz; kalau belum ada / basi, import dari CSV lalu simpan.
+
+    Return (dataset, sha256 CSV sumber).
+    """
+    dataset_path = dataset_path or default_dataset_path(csv_path)
+    csv_sha256 = csv_sha256 or file_sha256(csv_path)
+    try:
+        return CompactDataset.load(dataset_path, expected_sha256=csv_sha256), csv_sha256
+    except DatasetError as e:
+        print(f"! {e} - import dari {os.path.basename(csv_path)}")
+
+    dataset = CompactDataset.from_csv(csv_path)
+    try:
+        dataset.save(dataset_path, csv_sha256)
+        print(f"✓ Dataset tersimpan: {dataset_path}")
+    except OSError as e:
+        print(f"! Gagal menyimpan dataset: {e}")
+    return dataset, csv_sha256
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Konversi CSV ke dataset .npz kolumnar')
+    parser.add_argument('--csv', default=os.path.join(BASE_DIR, 'credit_risk_with_clusters.csv'),
+                        help='CSV sumber')
+    parser.add_argument('--output', help='Path .npz (default: models/<nama CSV>.npz)')
+    args = parser.parse_args()
+
+    output = args.output or default_dataset_path(args.csv)
+    dataset = CompactDataset.from_csv(args.csv)
+    dataset.save(output, file_sha256(args.csv))
+    print(f"✓ Dataset tersimpan: {output}")
+    print(f"  - Rows: {len(dataset)}")
+    print(f"  - Columns: {len(dataset.columns)} ({len(dataset.levels)} kategori)")
+    print(f"  - Size: {dataset.nbytes / 1e6:.1f} MB di memory, {os.path.getsize(output) / 1e6:.1f} MB di disk")
@@ -0,0 +1,541 @@
+"""
+Model bundle untuk credit risk clustering.
+
+Parameter hasil fit (scaler, centroid, kolom hasil encoding, level kategori,
+nilai imputasi, dan cluster_stats) disimpan sebagai artifact .npz yang
+versioned + checksummed, sehingga worker cukup memuat beberapa array NumPy
+saat startup tanpa refit KMeans.
+
+Serving cukup NumPy: pandas dan scikit-learn hanya di-import di jalur fit
+(fit_credit_model / build_bundle), supaya worker cepat start.
+
+Build artifact secara offline:
+    python credit_model.py [--csv credit_risk_with_clusters.csv] [--output models/credit_model.npz]
+"""
+import os
+import copy
+import json
+import hashlib
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from credit_dataset import file_sha256
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_PATH = os.path.join(BASE_DIR, 'credit_risk_with_clusters.csv')
+DEFAULT_BUNDLE_PATH = os.path.join(BASE_DIR, 'models', 'credit_model.npz')
+
+# Naikkan kalau layout bundle berubah, artifact lama otomatis dianggap basi
+BUNDLE_FORMAT_VERSION = 3
+
+# Minimal fraksi baris CSV yang label Cluster-nya direproduksi oleh centroid model
+LABEL_AGREEMENT_THRESHOLD = 0.99
+
+# Kuantil jarak anggota ke centroid-nya (data training), untuk deteksi out-of-distribution
+DISTANCE_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+OOD_QUANTILE = 0.99
+
+# Kandidat temperature membership (kelipatan median jarak kuadrat ke centroid terdekat)
+MEMBERSHIP_TEMPERATURE_SCALES = np.logspace(-2, 2, 41)
+
+# Urutan array di dalam bundle (dipakai juga untuk menghitung checksum)
+BUNDLE_ARRAYS = ('scaler_mean', 'scaler_scale', 'centroids')
+
+
+class BundleError(Exception):
+    """Artifact model tidak ada, rusak, atau basi terhadap CSV sumber"""
+
+
+def membership_probabilities(distances, temperature):
+    """softmax(-d^2 / T) per baris: probabilitas keanggotaan tiap cluster"""
+    squared = distances ** 2
+    weights = np.exp((squared.min(axis=-1, keepdims=True) - squared) / temperature)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+def calibrate_temperature(distances, default_rates, loan_status):
+    """Pilih temperature membership yang meminimalkan log loss expected default rate.
+
+    Expected default rate = sum(membership * default_rate cluster), dibandingkan
+    dengan loan_status data training.
+    """
+    base = float(np.median(distances.min(axis=1) ** 2)) or 1.0
+    best_loss, best_temperature = None, base
+    for scale in MEMBERSHIP_TEMPERATURE_SCALES:
+        temperature = base * float(scale)
+        expected = membership_probabilities(distances, temperature) @ default_rates
+        expected = np.clip(expected, 1e-6, 1 - 1e-6)
+        loss = -np.mean(loan_status * np.log(expected) + (1 - loan_status) * np.log1p(-expected))
+        if best_loss is None or loss < best_loss:
+            best_loss, best_temperature = loss, temperature
+    return best_temperature
+
+
+class CreditModel:
+    """Parameter model yang sudah di-fit, siap dipakai untuk scoring"""
+
+    def __init__(self, scaler_mean, scaler_scale, centroids, meta):
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.feature_columns = list(meta['feature_columns'])
+        self.encoded_feature_columns = list(meta['encoded_feature_columns'])
+        self.categorical_cols = list(meta['categorical_cols'])
+        self.categorical_levels = {col: list(levels)
+                                   for col, levels in meta['categorical_levels'].items()}
+        self.impute_values = dict(meta['impute_values'])
+        # JSON menyimpan key dict sebagai string, kembalikan ke int
+        self.cluster_stats = {int(cluster_id): dict(info)
+                              for cluster_id, info in meta['cluster_stats'].items()}
+        self.source_sha256 = meta['source_sha256']
+        self.label_agreement = meta['label_agreement']
+        self.version = meta['version']
+        self.created_at = meta['created_at']
+        self.membership_temperature = meta['membership_temperature']
+        # Per cluster: jarak pada DISTANCE_QUANTILES (None kalau cluster kosong saat fit)
+        self.distance_quantiles = meta['distance_quantiles']
+        # CompactScorer opsional (with_scorer); None = jarak float64 penuh
+        self.scorer = None
+        self._compile_encoder()
+        self._default_rates = np.array([self.cluster_stats[cluster_id]['default_rate']
+                                        for cluster_id in range(self.n_clusters)])
+        ood_index = DISTANCE_QUANTILES.index(OOD_QUANTILE)
+        self._ood_thresholds = np.array([np.inf if quantiles is None else quantiles[ood_index]
+                                         for quantiles in self.distance_quantiles])
+
+    def _compile_encoder(self):
+        """Precompile mapping field JSON -> slot di vektor hasil encoding"""
+        slot = {col: i for i, col in enumerate(self.encoded_feature_columns)}
+        self._numeric_slots = [(col, slot[col]) for col in self.feature_columns
+                               if col not in self.categorical_cols]
+        # Level -> index kolom dummy; level pertama di-drop (drop_first) jadi None
+        self._level_slots = [(col, {level: slot.get(f"{col}_{level}")
+                                    for level in self.categorical_levels[col]})
+                             for col in self.categorical_cols]
+
+    def encode(self, record, out=None):
+        """Encode satu record (dict) ke vektor float64 tanpa pandas.
+
+        Hasilnya sama dengan pd.get_dummies(drop_first=True) saat fit; level
+        yang tidak dikenal menjadi dummy nol semua dan angka kosong (None / NaN)
+        diisi nilai imputasi saat fit. `out` (opsional) adalah baris matrix yang
+        sudah berisi nol, untuk encoding batch.
+        """
+        x = np.zeros(len(self.encoded_feature_columns), dtype=np.float64) if out is None else out
+        for col, i in self._numeric_slots:
+            value = record[col]
+            # Konversi dulu baru cek NaN (string "nan" juga menjadi NaN)
+            value = np.nan if value is None else float(value)
+            x[i] = self.impute_values[col] if value != value else value
+        for col, levels in self._level_slots:
+            i = levels.get(record[col])
+            if i is not None:
+                x[i] = 1.0
+        return x
+
+    def encode_many(self, records):
+        """Encode list record ke matrix (n, n_features).
+
+        Return (matrix, errors): errors berisi {index: pesan} untuk record
+        yang gagal di-encode; barisnya dibiarkan nol dan harus diabaikan.
+        """
+        X = np.zeros((len(records), len(self.encoded_feature_columns)), dtype=np.float64)
+        errors = {}
+        for i, record in enumerate(records):
+            try:
+                self.encode(record, out=X[i])
+            except (KeyError, TypeError, ValueError) as e:
+                X[i] = 0.0
+                errors[i] = f'Nilai tidak valid: {e}'
+        return X, errors
+
+    def encode_columns(self, columns, impute=True):
+        """Encode data kolom (DataFrame / dict of arrays) ke matrix secara vectorized.
+
+        Dengan impute=True nilai kosong diisi nilai imputasi saat fit
+        (median numeric, modus kategori), sama seperti saat training.
+        """
+        n_rows = len(columns[self.feature_columns[0]])
+        X = np.zeros((n_rows, len(self.encoded_feature_columns)), dtype=np.float64)
+        for col, i in self._numeric_slots:
+            values = np.asarray(columns[col], dtype=np.float64)
+            X[:, i] = np.where(np.isnan(values), self.impute_values[col], values) if impute else values
+        for col, levels in self._level_slots:
+            values = np.asarray(columns[col], dtype=object)
+            if impute:
+                # Sama dengan pd.isna untuk object array: None atau NaN (NaN != NaN)
+                missing = np.equal(values, None) | (values != values)
+                values = np.where(missing, self.impute_values[col], values)
+            for level, i in levels.items():
+                if i is not None:
+                    X[:, i] = values == level
+        return X
+
+    def encode_field(self, col, values):
+        """Encoding satu field untuk beberapa nilai sekaligus.
+
+        Return (slots, block): index kolom hasil encoding milik field itu dan
+        matrix (len(values), len(slots)), untuk mengganti field tersebut
+        langsung di baris-baris hasil encode().
+        """
+        if col in self.categorical_levels:
+            levels = dict(self._level_slots)[col]
+            slots = [i for i in levels.values() if i is not None]
+            block = np.array([[levels.get(value) == i for i in slots] for value in values], dtype=np.float64)
+            return slots, block.reshape(len(values), len(slots))
+        slots = [dict(self._numeric_slots)[col]]
+        return slots, np.asarray(values, dtype=np.float64).reshape(-1, 1)
+
+    def scale(self, X):
+        """Sama dengan StandardScaler.transform: (x - mean) / scale"""
+        return (X - self.scaler_mean) / self.scaler_scale
+
+    def scaled_distances(self, X_scaled):
+        """Jarak euclidean ke tiap centroid untuk input yang sudah di-scale"""
+        if self.scorer is not None:
+            return self.scorer.distances(X_scaled)
+        return self.full_distances(X_scaled)
+
+    def full_distances(self, X_scaled):
+        """Jarak float64 penuh (referensi untuk CompactScorer)"""
+        return np.linalg.norm(self.centroids - X_scaled[..., np.newaxis, :], axis=-1)
+
+    def with_scorer(self, scorer):
+        """Salinan model yang menghitung jarak lewat scorer (parameter lain dibagi)"""
+        compact = copy.copy(self)
+        compact.scorer = scorer
+        return compact
+
+    def scorer_agreement(self, scorer, X_scaled):
+        """Fraksi baris yang cluster terdekatnya sama antara scorer dan jarak float64 penuh"""
+        full = np.argmin(self.full_distances(X_scaled), axis=-1)
+        return float(np.mean(np.argmin(scorer.distances(X_scaled), axis=-1) == full))
+
+    def distances(self, X):
+        """Jarak euclidean ke tiap centroid (ruang terstandardisasi).
+
+        X bisa satu vektor (hasil: (n_clusters,)) atau matrix (hasil: (n, n_clusters)).
+        """
+        return self.scaled_distances(self.scale(X))
+
+    def soft_assign(self, distances):
+        """Membership per cluster, expected default rate, dan flag out-of-distribution.
+
+        Dihitung dari vektor / matrix jarak yang sama dengan assignment (tanpa
+        pass tambahan). OOD = jarak ke centroid terdekat melebihi kuantil
+        OOD_QUANTILE jarak anggota cluster itu di data training.
+        """
+        probabilities = membership_probabilities(distances, self.membership_temperature)
+        # Elementwise (bukan @) supaya hasil satu vektor dan batch identik sampai bit terakhir
+        expected_default_rate = (probabilities * self._default_rates).sum(axis=-1)
+        nearest = np.argmin(distances, axis=-1)
+        out_of_distribution = np.min(distances, axis=-1) > self._ood_thresholds[nearest]
+        return probabilities, expected_default_rate, out_of_distribution
+
+    def assign(self, X):
+        """Cluster terdekat untuk vektor / matrix hasil encode"""
+        return np.argmin(self.distances(X), axis=-1)
+
+    def assign_scaled(self, X_scaled):
+        """Cluster terdekat untuk input yang sudah di-scale"""
+        return np.argmin(self.scaled_distances(X_scaled), axis=-1)
+
+    def verify_labels(self, columns, labels, threshold=LABEL_AGREEMENT_THRESHOLD):
+        """Pastikan re-predict baris tersimpan mereproduksi label Cluster-nya.
+
+        Return fraksi yang cocok; raise BundleError kalau di bawah threshold.
+        """
+        agreement = float(np.mean(self.assign(self.encode_columns(columns)) == np.asarray(labels)))
+        if agreement < threshold:
+            raise BundleError(
+                f"Label model hanya cocok {agreement:.2%} dengan kolom Cluster CSV "
+                f"(minimal {threshold:.0%})")
+        return agreement
+
+    def partial_fit(self, X, loan_status, source_sha256):
+        """Update model dengan data berlabel baru, O(jumlah baris baru).
+
+        Centroid di-update seperti MiniBatchKMeans (rata-rata berjalan dengan
+        learning rate 1/count per cluster) dan counter default rate per cluster
+        ditambah. Scaler, temperature membership dan kuantil jarak OOD tidak
+        diubah (sampai refit penuh). Model ini tidak diubah; return (model baru,
+        label cluster tiap baris baru).
+        """
+        labels = self.assign(X)
+        X_scaled = self.scale(X)
+        loan_status = np.asarray(loan_status)
+
+        centroids = self.centroids.copy()
+        cluster_stats = {}
+        for cluster_id in range(self.n_clusters):
+            info = self.cluster_stats[cluster_id]
+            size = info['size']
+            defaults = round(info['default_rate'] * size)
+
+            cluster_mask = labels == cluster_id
+            n_new = int(cluster_mask.sum())
+            if n_new:
+                centroids[cluster_id] = ((centroids[cluster_id] * size + X_scaled[cluster_mask].sum(axis=0))
+                                         / (size + n_new))
+                size += n_new
+                defaults += int(loan_status[cluster_mask].sum())
+
+            default_rate = defaults / size if size else 0.0
+            cluster_stats[cluster_id] = {
+                'default_rate': float(default_rate),
+                'size': int(size),
+                'approval_rate': float(1 - default_rate),
+                'cluster_id': cluster_id
+            }
+
+        created_at = datetime.now()
+        meta = self.meta()
+        meta.update({
+            'version': f"{created_at:%Y%m%d%H%M%S}-{source_sha256[:8]}",
+            'created_at': created_at.isoformat(),
+            'source_sha256': source_sha256,
+            'cluster_stats': cluster_stats,
+        })
+        return CreditModel(self.scaler_mean, self.scaler_scale, centroids, meta), labels
+
+    @property
+    def n_clusters(self):
+        return int(self.centroids.shape[0])
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in BUNDLE_ARRAYS}
+
+    def meta(self):
+        return {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'version': self.version,
+            'created_at': self.created_at,
+            'source_sha256': self.source_sha256,
+            'label_agreement': self.label_agreement,
+            'feature_columns': self.feature_columns,
+            'encoded_feature_columns': self.encoded_feature_columns,
+            'categorical_cols': self.categorical_cols,
+            'categorical_levels': self.categorical_levels,
+            'impute_values': self.impute_values,
+            'cluster_stats': {str(k): v for k, v in self.cluster_stats.items()},
+            'membership_temperature': self.membership_temperature,
+            'distance_quantiles': self.distance_quantiles,
+        }
+
+
+class CompactScorer:
+    """Jarak ke centroid sebagai satu matmul (default float32), opsional dengan fitur dipangkas.
+
+    ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2 dengan ||c||^2 dihitung sekali. Fitur
+    yang rentang centroid-nya (max - min, satuan std) <= prune_tolerance dianggap
+    sama di semua cluster: koordinat centroid-nya diganti rata-rata antar cluster,
+    jadi fitur itu tidak lagi ikut menentukan assignment.
+    """
+
+    def __init__(self, centroids, dtype=np.float32, prune_tolerance=0.0):
+        centroids = np.array(centroids, dtype=np.float64)
+        separation = centroids.max(axis=0) - centroids.min(axis=0)
+        self.dtype = np.dtype(dtype)
+        self.prune_tolerance = float(prune_tolerance)
+        self.pruned = np.flatnonzero(separation <= prune_tolerance)
+        centroids[:, self.pruned] = centroids[:, self.pruned].mean(axis=0)
+        self._weights = np.ascontiguousarray(-2.0 * centroids.T, dtype=self.dtype)
+        self._centroid_sq_norms = np.einsum('ij,ij->i', centroids, centroids).astype(self.dtype)
+
+    def distances(self, X_scaled):
+        """Sama dengan CreditModel.full_distances (vektor atau matrix), dihitung di dtype scorer"""
+        X = np.asarray(X_scaled, dtype=self.dtype)
+        sq = X @ self._weights + self._centroid_sq_norms
+        if X.ndim == 1:
+            sq += X @ X
+        else:
+            sq += np.einsum('ij,ij->i', X, X)[:, np.newaxis]
+        return np.sqrt(np.maximum(sq, 0), dtype=np.float64)
+
+    def describe(self, feature_columns):
+        return {
+            'dtype': self.dtype.name,
+            'prune_tolerance': self.prune_tolerance,
+            'pruned_features': [feature_columns[i] for i in self.pruned],
+        }
+
+
+def recommend(approval_rate):
+    """Rekomendasi (recommendation, risk_level, color) dari approval rate cluster"""
+    if approval_rate >= 0.7:
+        return "LAYAK", "RENDAH", "green"
+    elif approval_rate >= 0.5:
+        return "LAYAK (DENGAN PERTIMBANGAN)", "SEDANG", "yellow"
+    return "TIDAK LAYAK", "TINGGI", "red"
+
+
+def _to_builtin(value):
+    """Konversi scalar NumPy ke tipe Python supaya bisa di-serialize ke JSON"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def fit_credit_model(df, source_sha256):
+    """Fit scaler + centroid dari DataFrame credit_risk_with_clusters"""
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+
+    # Get feature columns (semua except Cluster dan loan_status)
+    feature_columns = [col for col in df.columns
+                       if col not in ['Cluster', 'loan_status']]
+
+    X = df[feature_columns].copy()
+
+    # Handle missing values - fill numeric with median, categorical with mode
+    numeric_cols = X.select_dtypes(include=[np.number]).columns
+    categorical_cols = X.select_dtypes(include=['object']).columns.tolist()
+
+    impute_values = {}
+    for col in numeric_cols:
+        impute_values[col] = _to_builtin(X[col].median())
+        X[col] = X[col].fillna(impute_values[col])
+
+    for col in categorical_cols:
+        mode = X[col].mode()
+        impute_values[col] = mode[0] if len(mode) > 0 else 'UNKNOWN'
+        X[col] = X[col].fillna(impute_values[col])
+
+    # Level kategori lengkap (urutan sama dengan pd.get_dummies, termasuk level yang di-drop)
+    categorical_levels = {col: sorted(X[col].unique().tolist()) for col in categorical_cols}
+
+    # One-hot encode categorical variables
+    X_encoded = pd.get_dummies(X, columns=categorical_cols, drop_first=True)
+    encoded_feature_columns = X_encoded.columns.tolist()
+
+    # Standardize
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X_encoded)
+
+    # Centroid = rata-rata tiap cluster di CSV (hasil KMeans generate_visualizations.py),
+    # jadi nomor cluster model sama dengan label Cluster yang tersimpan
+    labels = df['Cluster'].to_numpy()
+    n_clusters = int(labels.max()) + 1
+    centroids = np.array([X_scaled[labels == cluster_id].mean(axis=0)
+                          for cluster_id in range(n_clusters)])
+    if np.isnan(centroids).any():
+        raise ValueError("Ada cluster tanpa anggota di kolom Cluster")
+
+    # Statistik cluster dihitung dari assignment model yang dipakai scoring,
+    # bukan langsung dari kolom CSV, supaya default rate selalu milik cluster yang benar
+    distances = np.linalg.norm(centroids - X_scaled[:, np.newaxis, :], axis=-1)
+    predicted = np.argmin(distances, axis=1)
+    label_agreement = float(np.mean(predicted == labels))
+    loan_status = df['loan_status'].to_numpy()
+
+    # Calculate default rate per cluster
+    cluster_stats = {}
+    for cluster_id in range(n_clusters):
+        cluster_mask = predicted == cluster_id
+        default_rate = loan_status[cluster_mask].mean()
+        cluster_size = cluster_mask.sum()
+        cluster_stats[cluster_id] = {
+            'default_rate': float(default_rate),
+            'size': int(cluster_size),
+            'approval_rate': float(1 - default_rate),
+            'cluster_id': cluster_id
+        }
+
+    # Kalibrasi membership + kuantil jarak untuk flag out-of-distribution
+    default_rates = np.array([cluster_stats[cluster_id]['default_rate'] for cluster_id in range(n_clusters)])
+    membership_temperature = calibrate_temperature(distances, default_rates, loan_status)
+    distance_quantiles = []
+    for cluster_id in range(n_clusters):
+        own = distances[predicted == cluster_id, cluster_id]
+        distance_quantiles.append(np.quantile(own, DISTANCE_QUANTILES).tolist() if len(own) else None)
+
+    created_at = datetime.now()
+    meta = {
+        'version': f"{created_at:%Y%m%d%H%M%S}-{source_sha256[:8]}",
+        'created_at': created_at.isoformat(),
+        'source_sha256': source_sha256,
+        'label_agreement': label_agreement,
+        'feature_columns': feature_columns,
+        'encoded_feature_columns': encoded_feature_columns,
+        'categorical_cols': categorical_cols,
+        'categorical_levels': categorical_levels,
+        'impute_values': impute_values,
+        'cluster_stats': cluster_stats,
+        'membership_temperature': membership_temperature,
+        'distance_quantiles': distance_quantiles,
+    }
+    return CreditModel(scaler.mean_, scaler.scale_, centroids, meta)
+
+
+def _bundle_checksum(arrays, meta_json):
+    digest = hashlib.sha256(meta_json.encode('utf-8'))
+    for name in BUNDLE_ARRAYS:
+        array = np.ascontiguousarray(arrays[name], dtype=np.float64)
+        digest.update(name.encode('utf-8'))
+        digest.update(str(array.shape).encode('utf-8'))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def save_bundle(model, path=DEFAULT_BUNDLE_PATH):
+    """Simpan model ke artifact .npz secara atomic (tulis tmp lalu rename)"""
+    arrays = model.arrays()
+    meta_json = json.dumps(model.meta(), sort_keys=True)
+    checksum = _bundle_checksum(arrays, meta_json)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, meta=np.array(meta_json), checksum=np.array(checksum), **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_bundle(path=DEFAULT_BUNDLE_PATH, expected_sha256=None):
+    """Muat artifact model; raise BundleError kalau tidak valid atau basi"""
+    if not os.path.exists(path):
+        raise BundleError(f"Model bundle tidak ditemukan: {path}")
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in BUNDLE_ARRAYS}
+            meta_json = str(data['meta'])
+            checksum = str(data['checksum'])
+    except (OSError, KeyError, ValueError) as e:
+        raise BundleError(f"Model bundle tidak bisa dibaca: {e}") from e
+
+    if _bundle_checksum(arrays, meta_json) != checksum:
+        raise BundleError("Checksum model bundle tidak cocok (file rusak?)")
+
+    meta = json.loads(meta_json)
+    if meta.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise BundleError(
+            f"Format bundle v{meta.get('format_version')} != v{BUNDLE_FORMAT_VERSION}")
+    if expected_sha256 is not None and meta.get('source_sha256') != expected_sha256:
+        raise BundleError("Model bundle basi (CSV sumber sudah berubah)")
+
+    return CreditModel(arrays['scaler_mean'], arrays['scaler_scale'], arrays['centroids'], meta)
+
+
+def build_bundle(csv_path=DEFAULT_CSV_PATH, bundle_path=DEFAULT_BUNDLE_PATH):
+    """Fit model dari CSV lalu simpan artifact-nya"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    model = fit_credit_model(df, file_sha256(csv_path))
+    save_bundle(model, bundle_path)
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build model bundle dari CSV hasil clustering')
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='CSV sumber (dengan kolom Cluster)')
+    parser.add_argument('--output', default=DEFAULT_BUNDLE_PATH, help='Path artifact .npz')
+    args = parser.parse_args()
+
+    model = build_bundle(args.csv, args.output)
+    print(f"✓ Model bundle tersimpan: {args.output}")
+    print(f"  - Version: {model.version}")
+    print(f"  - Clusters: {model.n_clusters}")
+    print(f"  - Features: {len(model.encoded_feature_columns)}")
+    print(f"  - Label agreement: {model.label_agreement:.2%}")
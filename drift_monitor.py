@@ -0,0 +1,315 @@
+"""
+Monitor drift input dari traffic prediksi terhadap data training.
+
+Setiap applicant yang diprediksi menambah ringkasan streaming berukuran tetap:
+histogram bin tetap (batas bin = kuantil data training) dan running
+mean/variance per field angka, jumlah per level untuk field kategori, dan
+jumlah assignment per cluster. Update satu request O(jumlah field) tanpa
+menyimpan request. Seperti metrics, tiap worker menulis snapshot ke DRIFT_DIR
+dan /api/drift menggabungkan snapshot worker yang masih hidup (versi model
+sama), lalu membandingkan distribusinya dengan baseline training (PSI dan KL).
+"""
+import os
+import time
+import bisect
+
+import numpy as np
+
+from metrics import SnapshotFlusher, live_snapshots
+
+# Jumlah bin histogram field angka (+1 slot untuk nilai kosong)
+N_BINS = 10
+# Proporsi minimum per bin supaya log PSI / KL tetap terdefinisi untuk bin kosong
+PSI_EPSILON = 1e-4
+# Batas PSI yang umum dipakai: < 0.1 stabil, 0.1 - 0.25 bergeser sedang, > 0.25 signifikan
+PSI_THRESHOLDS = (0.1, 0.25)
+# Di bawah jumlah observasi ini status drift belum bisa dinilai
+MIN_OBSERVATIONS = 100
+
+STATUS_ORDER = ('insufficient_data', 'stable', 'moderate', 'significant')
+
+
+def _bin_index(values, edges):
+    """Index bin per nilai ((..., fitur) -> (..., fitur)); N_BINS untuk nilai kosong"""
+    bins = (values[..., np.newaxis] > edges).sum(axis=-1)
+    return np.where(np.isnan(values), edges.shape[-1] + 1, bins)
+
+
+def _count_rows(index, width):
+    """Jumlah per (kolom, nilai) dari matrix index (n, kolom) -> (kolom, width)"""
+    n_columns = index.shape[1]
+    flat = (index + np.arange(n_columns) * width).ravel()
+    return np.bincount(flat, minlength=n_columns * width).reshape(n_columns, width)
+
+
+def _moments(values):
+    """(count, mean, M2) per kolom, mengabaikan nilai kosong"""
+    present = ~np.isnan(values)
+    count = present.sum(axis=0).astype(np.float64)
+    mean = np.divide(np.where(present, values, 0.0).sum(axis=0), count,
+                     out=np.zeros(values.shape[1]), where=count > 0)
+    m2 = (np.where(present, values - mean, 0.0) ** 2).sum(axis=0)
+    return count, mean, m2
+
+
+def _merge_moments(count, mean, m2, other_count, other_mean, other_m2):
+    """Gabung running (count, mean, M2) dua kelompok (Chan et al.), per kolom"""
+    total = count + other_count
+    delta = other_mean - mean
+    ratio = np.divide(other_count, total, out=np.zeros_like(mean), where=total > 0)
+    return total, mean + delta * ratio, m2 + other_m2 + delta ** 2 * count * ratio
+
+
+def psi_kl(expected, observed):
+    """(PSI, KL(observed || expected)) dari jumlah per bin"""
+    p = np.maximum(observed / max(observed.sum(), 1), PSI_EPSILON)
+    q = np.maximum(expected / max(expected.sum(), 1), PSI_EPSILON)
+    # Normalisasi ulang setelah floor supaya tetap distribusi (KL >= 0)
+    p, q = p / p.sum(), q / q.sum()
+    log_ratio = np.log(p / q)
+    return float(np.sum((p - q) * log_ratio)), float(np.sum(p * log_ratio))
+
+
+def drift_status(psi, observations):
+    if observations < MIN_OBSERVATIONS:
+        return 'insufficient_data'
+    if psi < PSI_THRESHOLDS[0]:
+        return 'stable'
+    return 'moderate' if psi < PSI_THRESHOLDS[1] else 'significant'
+
+
+def _proportions(counts):
+    total = counts.sum()
+    return (counts / total if total else np.zeros(len(counts))).tolist()
+
+
+class DriftBaseline:
+    """Distribusi data training per field, dikompilasi sekali saat model dimuat"""
+
+    def __init__(self, model_version, numeric, edges, numeric_counts, numeric_moments,
+                 categorical, categorical_counts, cluster_counts):
+        self.model_version = model_version
+        # numeric: [col]; edges: (fitur, N_BINS - 1) batas dalam bin (kanan inklusif)
+        self.numeric = numeric
+        self.edges = edges
+        self.numeric_counts = numeric_counts
+        self.count, self.mean, self.m2 = numeric_moments
+        # categorical: [(col, levels)]; slot terakhir tiap baris = kosong / level tidak dikenal
+        self.categorical = categorical
+        self.categorical_counts = categorical_counts
+        self.cluster_counts = cluster_counts
+        self.null_slot = categorical_counts.shape[1] - 1
+        self.level_index = [(col, {level: i for i, level in enumerate(levels)}) for col, levels in categorical]
+        # Jalur satu record pakai bisect di list Python (lebih murah dari operasi NumPy kecil)
+        self.edge_lists = edges.tolist()
+
+    @classmethod
+    def compile(cls, model, dataset):
+        """Baseline dari dataset training: kuantil + histogram angka, frekuensi level, ukuran cluster"""
+        numeric = [col for col in model.feature_columns if col not in model.categorical_levels]
+        values = np.column_stack([dataset.columns[col].astype(np.float64) for col in numeric])
+        quantiles = np.linspace(0, 1, N_BINS + 1)[1:-1]
+        edges = np.array([np.quantile(column[~np.isnan(column)], quantiles) for column in values.T])
+        numeric_counts = _count_rows(_bin_index(values, edges), N_BINS + 1)
+
+        categorical = [(col, list(model.categorical_levels[col])) for col in model.categorical_cols]
+        width = max((len(levels) for _, levels in categorical), default=0) + 1
+        categorical_counts = np.zeros((len(categorical), width), dtype=np.int64)
+        for row, (col, levels) in enumerate(categorical):
+            # Kode dataset mengacu ke level dataset (-1 = kosong), petakan ke urutan level model
+            position = {level: i for i, level in enumerate(levels)}
+            mapping = np.array([position.get(level, width - 1) for level in dataset.levels[col]] + [width - 1])
+            categorical_counts[row] = np.bincount(mapping[dataset.columns[col]], minlength=width)
+
+        cluster_counts = np.array([model.cluster_stats.get(cluster_id, {}).get('size', 0)
+                                   for cluster_id in range(model.n_clusters)], dtype=np.int64)
+        return cls(model.version, numeric, edges, numeric_counts, _moments(values),
+                   categorical, categorical_counts, cluster_counts)
+
+
+class DriftMonitor(SnapshotFlusher):
+    """Ringkasan streaming traffic per proses, digabung antar worker lewat snapshot.
+
+    State disimpan sebagai list Python: update satu request cukup beberapa
+    operasi skalar per field, batch dihitung dengan NumPy lalu ditambahkan.
+    """
+
+    kind = 'drift'
+
+    def __init__(self, snapshot_dir=None, flush_interval=5.0):
+        super().__init__(snapshot_dir, flush_interval)
+        self.baseline = None
+
+    def _reset_after_fork(self):
+        """Worker hasil fork mulai dari ringkasan kosong (baseline master tetap dipakai)"""
+        super()._reset_after_fork()
+        if self.baseline is not None:
+            self._clear()
+
+    def _clear(self):
+        baseline = self.baseline
+        self.numeric_counts = np.zeros_like(baseline.numeric_counts).tolist()
+        self.categorical_counts = np.zeros_like(baseline.categorical_counts).tolist()
+        self.cluster_counts = [0] * len(baseline.cluster_counts)
+        self.count = [0.0] * len(baseline.numeric)
+        self.mean = [0.0] * len(baseline.numeric)
+        self.m2 = [0.0] * len(baseline.numeric)
+        self.observations = 0
+        self._dirty = True
+
+    def install(self, baseline):
+        """Pakai baseline model baru; ringkasan dimulai dari nol kalau versi model berubah"""
+        with self._lock:
+            same_model = self.baseline is not None and self.baseline.model_version == baseline.model_version
+            self.baseline = baseline
+            if not same_model:
+                self._clear()
+
+    def observe(self, record, cluster_id):
+        """Catat satu applicant (record yang sudah lolos schema) dan cluster hasil prediksinya"""
+        baseline = self.baseline
+        if baseline is None:
+            return
+        values = [record.get(col) for col in baseline.numeric]
+        values = [np.nan if value is None else float(value) for value in values]
+        levels = [index.get(record.get(col), baseline.null_slot) for col, index in baseline.level_index]
+
+        with self._lock:
+            if baseline is not self.baseline:
+                return
+            for i, value in enumerate(values):
+                if value != value:
+                    self.numeric_counts[i][N_BINS] += 1
+                    continue
+                # Jumlah batas bin < nilai = index bin (bin kanan inklusif, sama dengan _bin_index)
+                self.numeric_counts[i][bisect.bisect_left(baseline.edge_lists[i], value)] += 1
+                # Welford: running mean / M2 tanpa menyimpan nilai
+                self.count[i] += 1
+                delta = value - self.mean[i]
+                self.mean[i] += delta / self.count[i]
+                self.m2[i] += delta * (value - self.mean[i])
+            for i, level in enumerate(levels):
+                self.categorical_counts[i][level] += 1
+            self.cluster_counts[int(cluster_id)] += 1
+            self.observations += 1
+            self._dirty = True
+        self.ensure_flusher()
+
+    def observe_many(self, records, cluster_ids):
+        """Catat beberapa applicant sekaligus (vectorized per kolom)"""
+        baseline = self.baseline
+        if baseline is None or not records:
+            return
+        values = np.array([[record.get(col) for col in baseline.numeric] for record in records],
+                          dtype=np.float64)
+        numeric_counts = _count_rows(_bin_index(values, baseline.edges), N_BINS + 1)
+        levels = np.array([[index.get(record.get(col), baseline.null_slot) for col, index in baseline.level_index]
+                           for record in records], dtype=np.int64).reshape(len(records), len(baseline.categorical))
+        categorical_counts = _count_rows(levels, baseline.null_slot + 1)
+        cluster_counts = np.bincount(cluster_ids, minlength=len(baseline.cluster_counts))
+        moments = _moments(values)
+
+        with self._lock:
+            if baseline is not self.baseline:
+                return  # model diganti di tengah request: ringkasan baru sudah dimulai
+            self.numeric_counts = (np.array(self.numeric_counts) + numeric_counts).tolist()
+            self.categorical_counts = (np.array(self.categorical_counts) + categorical_counts).tolist()
+            self.cluster_counts = (np.array(self.cluster_counts) + cluster_counts).tolist()
+            merged = _merge_moments(np.array(self.count), np.array(self.mean), np.array(self.m2), *moments)
+            self.count, self.mean, self.m2 = (part.tolist() for part in merged)
+            self.observations += len(records)
+            self._dirty = True
+        self.ensure_flusher()
+
+    def snapshot(self):
+        with self._lock:
+            if self.baseline is None:
+                return {'pid': os.getpid(), 'time': time.time(), 'model_version': None}
+            return {
+                'pid': os.getpid(),
+                'time': time.time(),
+                'model_version': self.baseline.model_version,
+                'observations': self.observations,
+                'numeric_counts': [row[:] for row in self.numeric_counts],
+                'categorical_counts': [row[:] for row in self.categorical_counts],
+                'cluster_counts': self.cluster_counts[:],
+                'moments': [self.count[:], self.mean[:], self.m2[:]],
+            }
+
+    def report(self):
+        """Gabungkan ringkasan semua worker (versi model sama) dan bandingkan dengan baseline"""
+        baseline = self.baseline
+        own = self.snapshot()
+        snapshots = [snapshot for snapshot in live_snapshots(self.snapshot_dir, own)
+                     if snapshot.get('model_version') == baseline.model_version]
+        numeric_counts = np.zeros_like(baseline.numeric_counts)
+        categorical_counts = np.zeros_like(baseline.categorical_counts)
+        cluster_counts = np.zeros_like(baseline.cluster_counts)
+        count, mean, m2 = (np.zeros(len(baseline.numeric)) for _ in range(3))
+        observations = 0
+        for snapshot in snapshots:
+            numeric_counts += np.asarray(snapshot['numeric_counts'], dtype=np.int64)
+            categorical_counts += np.asarray(snapshot['categorical_counts'], dtype=np.int64)
+            cluster_counts += np.asarray(snapshot['cluster_counts'], dtype=np.int64)
+            count, mean, m2 = _merge_moments(count, mean, m2, *(np.asarray(part) for part in snapshot['moments']))
+            observations += snapshot['observations']
+
+        features = {}
+        for i, col in enumerate(baseline.numeric):
+            psi, kl = psi_kl(baseline.numeric_counts[i], numeric_counts[i])
+            baseline_std = float(np.sqrt(baseline.m2[i] / baseline.count[i]))
+            std = float(np.sqrt(m2[i] / count[i])) if count[i] else None
+            features[col] = {
+                'type': 'number',
+                'psi': psi,
+                'kl': kl,
+                'status': drift_status(psi, observations),
+                'missing_rate': float(numeric_counts[i, N_BINS] / observations) if observations else None,
+                'mean': float(mean[i]) if count[i] else None,
+                'std': std,
+                'baseline_mean': float(baseline.mean[i]),
+                'baseline_std': baseline_std,
+                # Pergeseran mean dalam satuan std training
+                'mean_shift': float((mean[i] - baseline.mean[i]) / baseline_std) if count[i] and baseline_std else None,
+                'bins': {
+                    'edges': baseline.edges[i].tolist(),
+                    'baseline': _proportions(baseline.numeric_counts[i]),
+                    'live': _proportions(numeric_counts[i]),
+                },
+            }
+        for i, (col, levels) in enumerate(baseline.categorical):
+            slots = list(range(len(levels))) + [baseline.null_slot]
+            psi, kl = psi_kl(baseline.categorical_counts[i, slots], categorical_counts[i, slots])
+            baseline_share = _proportions(baseline.categorical_counts[i, slots])
+            live_share = _proportions(categorical_counts[i, slots])
+            features[col] = {
+                'type': 'category',
+                'psi': psi,
+                'kl': kl,
+                'status': drift_status(psi, observations),
+                'levels': {level: {'baseline': baseline_share[j], 'live': live_share[j]}
+                           for j, level in enumerate(levels)},
+                'missing_rate': live_share[-1] if observations else None,
+            }
+
+        psi, kl = psi_kl(baseline.cluster_counts, cluster_counts)
+        clusters = {
+            'psi': psi,
+            'kl': kl,
+            'status': drift_status(psi, observations),
+            'baseline': _proportions(baseline.cluster_counts),
+            'live': _proportions(cluster_counts),
+        }
+        statuses = [feature['status'] for feature in features.values()] + [clusters['status']]
+        return {
+            'model_version': baseline.model_version,
+            'observations': observations,
+            'workers': len(snapshots),
+            'status': max(statuses, key=STATUS_ORDER.index),
+            'drifted_features': [col for col, feature in features.items()
+                                 if feature['status'] in ('moderate', 'significant')],
+            'thresholds': {'moderate': PSI_THRESHOLDS[0], 'significant': PSI_THRESHOLDS[1],
+                           'min_observations': MIN_OBSERVATIONS},
+            'features': features,
+            'clusters': clusters,
+        }
@@ -1,4 +1,9 @@
 import os
+import sys
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -7,137 +12,275 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.cluster import KMeans
 
+import credit_model
+from credit_dataset import load_dataset
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa file lock
+    fcntl = None
+
 # Set style - SAMA PERSIS SEPERTI TA10.ipynb
 sns.set(style="whitegrid")
 
 # Base path (script directory) and create images directory if not exists
 BASE_DIR = os.path.dirname(__file__)
 IMG_DIR = os.path.join(BASE_DIR, 'static', 'img')
-os.makedirs(IMG_DIR, exist_ok=True)
+# Cache hasil KMeans per k (inertia, centroid, label), key = hash data
+CACHE_DIR = os.path.join(BASE_DIR, '.cache', 'kmeans')
 
-# Load data - SAMA PERSIS SEPERTI TA10.ipynb
-csv_path = os.path.join(BASE_DIR, 'credit_risk_dataset.csv')
-df = pd.read_csv(csv_path)
+K_RANGE = range(1, 11)
+OPTIMAL_K = 4  # ganti sesuai elbow kamu
 
-print("Shape:", df.shape)
-print("Columns:", df.columns.tolist())
+# Data untuk proses worker elbow (diisi oleh _init_worker, tidak di-pickle per task)
+_worker_X = None
 
-# ===== STEP 1: Kalau ada kolom target, drop (unsupervised) - SAMA DENGAN CELL #VSC-d39047d7 =====
-target_cols = [c for c in df.columns if c.lower() in ["loan_status", "target", "default", "y"]]
-print("Detected target columns:", target_cols)
 
-X = df.drop(columns=target_cols) if len(target_cols) > 0 else df.copy()
-print("Feature shape:", X.shape)
+def save_figure(filename):
+    """Simpan figure aktif ke static/img secara atomic (tmp lalu rename)"""
+    path = os.path.join(IMG_DIR, filename)
+    tmp_path = f"{path}.tmp-{os.getpid()}.png"
+    plt.savefig(tmp_path, bbox_inches='tight')
+    plt.close()
+    os.replace(tmp_path, path)
 
-# ===== STEP 2: Pisahkan numeric vs categorical - SAMA DENGAN CELL #VSC-5c284c82 =====
-num_cols = X.select_dtypes(include=np.number).columns
-cat_cols = X.select_dtypes(exclude=np.number).columns
 
-print("Numeric cols:", list(num_cols))
-print("Categorical cols:", list(cat_cols))
+def data_hash(X):
+    """Hash isi matrix (shape + bytes) untuk key cache"""
+    digest = hashlib.sha256(str(X.shape).encode('utf-8'))
+    digest.update(np.ascontiguousarray(X).tobytes())
+    return digest.hexdigest()[:16]
 
-# Isi missing numeric dengan median
-for c in num_cols:
-    X[c] = X[c].fillna(X[c].median())
 
-# Isi missing categorical dengan modus
-for c in cat_cols:
-    X[c] = X[c].fillna(X[c].mode()[0])
+def fit_kmeans(X, k):
+    """KMeans dengan parameter SAMA DENGAN TA10.ipynb"""
+    km = KMeans(n_clusters=k, random_state=42, n_init="auto")
+    km.fit(X)
+    return {'inertia': km.inertia_, 'centroids': km.cluster_centers_, 'labels': km.labels_}
 
-# ===== STEP 3: One-Hot Encoding - SAMA DENGAN CELL #VSC-e5ac055c =====
-X_encoded = pd.get_dummies(X, columns=cat_cols, drop_first=True)
-print("Shape after encoding:", X_encoded.shape)
 
-# ===== STEP 4: Scale - SAMA DENGAN CELL #VSC-91c29286 =====
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X_encoded)
+def _init_worker(X, threads):
+    global _worker_X
+    _worker_X = X
+    # Batasi thread OpenMP/BLAS per proses supaya tidak oversubscribe CPU
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(limits=threads)
 
-# ===== VISUALIZATION 1: Elbow Method - SAMA DENGAN CELL #VSC-0d046bff =====
-print("\n--- Generating Elbow Method (CELL #VSC-0d046bff) ---")
-wcss = []
-K_range = range(1, 11)
 
-for k in K_range:
-    km = KMeans(n_clusters=k, random_state=42, n_init="auto")
-    km.fit(X_scaled)
-    wcss.append(km.inertia_)
-
-plt.figure(figsize=(8,5))
-plt.plot(K_range, wcss, marker="o")
-plt.title("Elbow Method")
-plt.xlabel("Number of clusters (k)")
-plt.ylabel("WCSS / Inertia")
-plt.xticks(K_range)
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(os.path.join(IMG_DIR, 'elbow_method.png'), bbox_inches='tight')
-plt.close()
-print("✓ Saved: static/img/elbow_method.png")
-
-# ===== STEP 5: KMeans optimal_k=4 - SAMA DENGAN CELL #VSC-c2d6a157 =====
-print("\n--- Running KMeans with k=4 (CELL #VSC-c2d6a157) ---")
-optimal_k = 4  # ganti sesuai elbow kamu
-kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init="auto")
-clusters = kmeans.fit_predict(X_scaled)
-
-df["Cluster"] = clusters
-print(df["Cluster"].value_counts().sort_index())
-
-# ===== VISUALIZATION 2: PCA 2D Clusters - SAMA DENGAN CELL #VSC-99942488 =====
-print("\n--- Generating PCA 2D Clusters (CELL #VSC-99942488) ---")
-pca = PCA(n_components=2, random_state=42)
-X_pca = pca.fit_transform(X_scaled)
-
-plt.figure(figsize=(8,6))
-sns.scatterplot(x=X_pca[:,0], y=X_pca[:,1], hue=clusters, palette="bright", alpha=0.7)
-plt.title("KMeans Clusters (PCA 2D)")
-plt.xlabel("PCA Component 1")
-plt.ylabel("PCA Component 2")
-plt.legend(title="Cluster")
-plt.tight_layout()
-plt.savefig(os.path.join(IMG_DIR, 'pca_clusters.png'), bbox_inches='tight')
-plt.close()
-print("✓ Saved: static/img/pca_clusters.png")
-
-# ===== STEP 6: Cluster Profile - SAMA DENGAN CELL #VSC-e0569166 =====
-print("\n--- Computing Cluster Profiles (CELL #VSC-e0569166) ---")
-cluster_profile = df.groupby("Cluster").mean(numeric_only=True)
-print(cluster_profile)
-
-# ===== VISUALIZATION 3: Cluster Heatmap - SAMA DENGAN CELL #VSC-b6fef279 =====
-print("\n--- Generating Cluster Heatmap (CELL #VSC-b6fef279) ---")
-plt.figure(figsize=(14,6))
-sns.heatmap(cluster_profile.T, annot=True, fmt=".2f", cmap="YlGnBu")
-plt.title("Cluster Feature Means (Heatmap)")
-plt.ylabel("Features")
-plt.xlabel("Cluster")
-plt.tight_layout()
-plt.savefig(os.path.join(IMG_DIR, 'cluster_heatmap.png'), bbox_inches='tight')
-plt.close()
-print("✓ Saved: static/img/cluster_heatmap.png")
-
-# ===== VISUALIZATION 4: Cluster Profiles for Key Features - SAMA DENGAN CELL #VSC-d8086cfe =====
-print("\n--- Generating Cluster Profiles Bar Chart (CELL #VSC-d8086cfe) ---")
-key_features = [c for c in ["person_income","loan_amnt","loan_int_rate",
-                           "loan_percent_income","person_age","cb_person_cred_hist_length"]
-                if c in df.columns]
-
-print("Key features used:", key_features)
-
-cluster_profile[key_features].plot(kind="bar", figsize=(10,6))
-plt.title("Cluster Profiles for Key Features")
-plt.ylabel("Mean Value")
-plt.xlabel("Cluster")
-plt.xticks(rotation=0)
-plt.legend(title="Feature")
-plt.tight_layout()
-plt.savefig(os.path.join(IMG_DIR, 'cluster_profiles.png'), bbox_inches='tight')
-plt.close()
-print("✓ Saved: static/img/cluster_profiles.png")
-
-# ===== SAVE DATA WITH CLUSTERS - SAMA DENGAN CELL #VSC-becc9c73 =====
-print("\n--- Saving data with clusters (CELL #VSC-becc9c73) ---")
-df.to_csv("credit_risk_with_clusters.csv", index=False)
-print("Saved: credit_risk_with_clusters.csv")
-
-print("\n✅ ALL VISUALIZATIONS GENERATED - LOGIC 100% SAMA DENGAN TA10.ipynb")
+def _fit_in_worker(k):
+    return k, fit_kmeans(_worker_X, k)
+
+
+def kmeans_sweep(X, k_values, workers=None, use_cache=True):
+    """Fit KMeans untuk setiap k (paralel antar proses), dengan cache per k.
+
+    Return dict k -> {'inertia', 'centroids', 'labels'}.
+    """
+    key = data_hash(X)
+    results = {}
+    if use_cache:
+        for k in k_values:
+            path = os.path.join(CACHE_DIR, f"{key}_k{k}.npz")
+            if os.path.exists(path):
+                with np.load(path) as cached:
+                    results[k] = {name: cached[name] for name in ('inertia', 'centroids', 'labels')}
+                    results[k]['inertia'] = float(results[k]['inertia'])
+
+    todo = [k for k in k_values if k not in results]
+    if todo:
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        if workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(X, threads)) as pool:
+                # k besar paling lama, submit duluan
+                for k, result in pool.map(_fit_in_worker, sorted(todo, reverse=True)):
+                    results[k] = result
+        else:
+            for k in todo:
+                results[k] = fit_kmeans(X, k)
+
+        if use_cache:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            for k in todo:
+                path = os.path.join(CACHE_DIR, f"{key}_k{k}.npz")
+                tmp_path = f"{path}.tmp-{os.getpid()}"
+                with open(tmp_path, 'wb') as f:
+                    np.savez(f, **results[k])
+                os.replace(tmp_path, path)
+
+    print(f"KMeans sweep: {len(k_values) - len(todo)} dari cache, {len(todo)} di-fit")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate visualisasi clustering + model bundle')
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('ELBOW_WORKERS', 0)) or None,
+                        help='Jumlah proses untuk elbow sweep (default: jumlah CPU)')
+    parser.add_argument('--elbow-sample-size', type=int,
+                        default=int(os.environ.get('ELBOW_SAMPLE_SIZE', 0)),
+                        help='Subsample baris untuk plot elbow (0 = semua data)')
+    parser.add_argument('--no-cache', action='store_true', help='Abaikan cache KMeans')
+    parser.add_argument('--images-only', action='store_true',
+                        help='Hanya buat gambar, jangan tulis ulang CSV / model bundle')
+    parser.add_argument('--lock', help='File lock; keluar kalau proses lain sedang generate')
+    args = parser.parse_args(argv)
+    use_cache = not args.no_cache
+
+    if args.lock and fcntl is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(args.lock)), exist_ok=True)
+        lock_file = open(args.lock, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print("! Visualisasi sedang dibuat proses lain, skip")
+            sys.exit(0)
+        # Lock dilepas otomatis saat proses selesai
+
+    os.makedirs(IMG_DIR, exist_ok=True)
+
+    # Load data - SAMA PERSIS SEPERTI TA10.ipynb
+    # CSV hanya sumber import; yang dibaca dataset .npz kolumnar (models/credit_risk_dataset.npz)
+    csv_path = os.path.join(BASE_DIR, 'credit_risk_dataset.csv')
+    df = load_dataset(csv_path)[0].to_frame()
+
+    print("Shape:", df.shape)
+    print("Columns:", df.columns.tolist())
+
+    # ===== STEP 1: Kalau ada kolom target, drop (unsupervised) - SAMA DENGAN CELL #VSC-d39047d7 =====
+    target_cols = [c for c in df.columns if c.lower() in ["loan_status", "target", "default", "y"]]
+    print("Detected target columns:", target_cols)
+
+    X = df.drop(columns=target_cols) if len(target_cols) > 0 else df.copy()
+    print("Feature shape:", X.shape)
+
+    # ===== STEP 2: Pisahkan numeric vs categorical - SAMA DENGAN CELL #VSC-5c284c82 =====
+    num_cols = X.select_dtypes(include=np.number).columns
+    cat_cols = X.select_dtypes(exclude=np.number).columns
+
+    print("Numeric cols:", list(num_cols))
+    print("Categorical cols:", list(cat_cols))
+
+    # Isi missing numeric dengan median
+    for c in num_cols:
+        X[c] = X[c].fillna(X[c].median())
+
+    # Isi missing categorical dengan modus
+    for c in cat_cols:
+        X[c] = X[c].fillna(X[c].mode()[0])
+
+    # ===== STEP 3: One-Hot Encoding - SAMA DENGAN CELL #VSC-e5ac055c =====
+    X_encoded = pd.get_dummies(X, columns=cat_cols, drop_first=True)
+    print("Shape after encoding:", X_encoded.shape)
+
+    # ===== STEP 4: Scale - SAMA DENGAN CELL #VSC-91c29286 =====
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X_encoded)
+
+    # ===== VISUALIZATION 1: Elbow Method - SAMA DENGAN CELL #VSC-0d046bff =====
+    print("\n--- Generating Elbow Method (CELL #VSC-0d046bff) ---")
+    sample_size = args.elbow_sample_size
+    if 0 < sample_size < len(X_scaled):
+        # Subsample hanya untuk kurva elbow; KMeans final tetap di data penuh
+        rows = np.random.RandomState(42).choice(len(X_scaled), size=sample_size, replace=False)
+        X_elbow = X_scaled[np.sort(rows)]
+        print(f"Elbow memakai subsample {sample_size} dari {len(X_scaled)} baris")
+    else:
+        X_elbow = X_scaled
+
+    sweep = kmeans_sweep(X_elbow, list(K_RANGE), workers=args.workers, use_cache=use_cache)
+    wcss = [sweep[k]['inertia'] for k in K_RANGE]
+
+    plt.figure(figsize=(8,5))
+    plt.plot(K_RANGE, wcss, marker="o")
+    plt.title("Elbow Method")
+    plt.xlabel("Number of clusters (k)")
+    plt.ylabel("WCSS / Inertia")
+    plt.xticks(K_RANGE)
+    plt.grid(True)
+    plt.tight_layout()
+    save_figure('elbow_method.png')
+    print("✓ Saved: static/img/elbow_method.png")
+
+    # ===== STEP 5: KMeans optimal_k=4 - SAMA DENGAN CELL #VSC-c2d6a157 =====
+    print("\n--- Running KMeans with k=4 (CELL #VSC-c2d6a157) ---")
+    if X_elbow is X_scaled:
+        # Pakai ulang hasil fit k=4 dari elbow sweep (tidak fit ulang)
+        clusters = sweep[OPTIMAL_K]['labels']
+    else:
+        clusters = kmeans_sweep(X_scaled, [OPTIMAL_K], workers=1, use_cache=use_cache)[OPTIMAL_K]['labels']
+
+    df["Cluster"] = clusters
+    print(df["Cluster"].value_counts().sort_index())
+
+    # ===== VISUALIZATION 2: PCA 2D Clusters - SAMA DENGAN CELL #VSC-99942488 =====
+    print("\n--- Generating PCA 2D Clusters (CELL #VSC-99942488) ---")
+    pca = PCA(n_components=2, random_state=42)
+    X_pca = pca.fit_transform(X_scaled)
+
+    plt.figure(figsize=(8,6))
+    sns.scatterplot(x=X_pca[:,0], y=X_pca[:,1], hue=clusters, palette="bright", alpha=0.7)
+    plt.title("KMeans Clusters (PCA 2D)")
+    plt.xlabel("PCA Component 1")
+    plt.ylabel("PCA Component 2")
+    plt.legend(title="Cluster")
+    plt.tight_layout()
+    save_figure('pca_clusters.png')
+    print("✓ Saved: static/img/pca_clusters.png")
+
+    # ===== STEP 6: Cluster Profile - SAMA DENGAN CELL #VSC-e0569166 =====
+    print("\n--- Computing Cluster Profiles (CELL #VSC-e0569166) ---")
+    cluster_profile = df.groupby("Cluster").mean(numeric_only=True)
+    print(cluster_profile)
+
+    # ===== VISUALIZATION 3: Cluster Heatmap - SAMA DENGAN CELL #VSC-b6fef279 =====
+    print("\n--- Generating Cluster Heatmap (CELL #VSC-b6fef279) ---")
+    plt.figure(figsize=(14,6))
+    sns.heatmap(cluster_profile.T, annot=True, fmt=".2f", cmap="YlGnBu")
+    plt.title("Cluster Feature Means (Heatmap)")
+    plt.ylabel("Features")
+    plt.xlabel("Cluster")
+    plt.tight_layout()
+    save_figure('cluster_heatmap.png')
+    print("✓ Saved: static/img/cluster_heatmap.png")
+
+    # ===== VISUALIZATION 4: Cluster Profiles for Key Features - SAMA DENGAN CELL #VSC-d8086cfe =====
+    print("\n--- Generating Cluster Profiles Bar Chart (CELL #VSC-d8086cfe) ---")
+    key_features = [c for c in ["person_income","loan_amnt","loan_int_rate",
+                               "loan_percent_income","person_age","cb_person_cred_hist_length"]
+                    if c in df.columns]
+
+    print("Key features used:", key_features)
+
+    cluster_profile[key_features].plot(kind="bar", figsize=(10,6))
+    plt.title("Cluster Profiles for Key Features")
+    plt.ylabel("Mean Value")
+    plt.xlabel("Cluster")
+    plt.xticks(rotation=0)
+    plt.legend(title="Feature")
+    plt.tight_layout()
+    save_figure('cluster_profiles.png')
+    print("✓ Saved: static/img/cluster_profiles.png")
+
+    if args.images_only:
+        print("\n✅ ALL VISUALIZATIONS GENERATED (images only)")
+        return
+
+    # ===== SAVE DATA WITH CLUSTERS - SAMA DENGAN CELL #VSC-becc9c73 =====
+    print("\n--- Saving data with clusters (CELL #VSC-becc9c73) ---")
+    clusters_csv_path = os.path.join(BASE_DIR, 'credit_risk_with_clusters.csv')
+    df.to_csv(clusters_csv_path, index=False)
+    print("Saved: credit_risk_with_clusters.csv")
+    load_dataset(clusters_csv_path)
+
+    # ===== BUILD MODEL BUNDLE (dipakai app.py saat startup, tanpa refit) =====
+    print("\n--- Building model bundle ---")
+    bundle = credit_model.build_bundle(clusters_csv_path, credit_model.DEFAULT_BUNDLE_PATH)
+    print(f"Saved: models/credit_model.npz (version {bundle.version})")
+
+    print("\n✅ ALL VISUALIZATIONS GENERATED - LOGIC 100% SAMA DENGAN TA10.ipynb")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Konfigurasi gunicorn (dibaca otomatis dari working directory).
+
+Model dan dataset dimuat sekali di master (preload_app) lalu worker di-fork,
+sehingga array NumPy-nya dibagi copy-on-write antar worker, bukan disalin
+per worker. Setiap worker mencetak RSS-nya setelah start.
+
+Mode high-concurrency: GUNICORN_THREADS > 1 memakai worker gthread, sehingga
+satu client lambat tidak memblok seluruh worker dan semua thread berbagi satu
+model. Opsional PREDICT_MICRO_BATCH_MS > 0 menggabungkan request /api/predict
+yang bersamaan menjadi satu perhitungan jarak vectorized.
+
+Snapshot metrics / drift per worker dari run sebelumnya dihapus saat master
+start, supaya pid yang dipakai ulang tidak menghidupkan counter lama.
+"""
+import gc
+import os
+
+from metrics import clear_snapshots
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+if threads > 1:
+    worker_class = 'gthread'
+
+# Direktori snapshot per worker (default sama dengan app.py; kosong = per proses saja)
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIRS = (os.environ.get('METRICS_DIR', os.path.join(ROOT_DIR, '.cache', 'metrics')),
+                 os.environ.get('DRIFT_DIR', os.path.join(ROOT_DIR, '.cache', 'drift')))
+
+
+def memory_usage_mb():
+    """Memory proses saat ini dalam MB.
+
+    Linux: 'rss', 'pss' (shared page dibagi rata) dan 'private' (page milik
+    worker ini saja, yaitu biaya sebenarnya per worker tambahan).
+    """
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    name = 'private' if key.startswith('Private') else key.lower()
+                    usage[name] = usage.get(name, 0) + int(value.split()[0]) / 1024
+    except OSError:
+        # Non-Linux: hanya peak RSS yang tersedia
+        import resource
+        usage['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+
+def on_starting(server):
+    # Worker belum ada: semua snapshot yang tersisa milik proses dari run sebelumnya
+    for snapshot_dir in SNAPSHOT_DIRS:
+        removed = clear_snapshots(snapshot_dir)
+        if removed:
+            server.log.info("Removed %d stale snapshot(s) from %s", removed, snapshot_dir)
+
+
+def when_ready(server):
+    # Bekukan object hasil preload supaya GC tidak menyentuh (dan menyalin) page-nya
+    gc.freeze()
+    usage = memory_usage_mb()
+    server.log.info("Master ready: RSS %.1f MB (preload_app=%s)", usage['rss'], preload_app)
+
+
+def post_worker_init(worker):
+    usage = memory_usage_mb()
+    details = ', '.join(f"{name} {value:.1f} MB" for name, value in usage.items() if name != 'rss')
+    worker.log.info("Worker %s RSS %.1f MB (%s)", worker.pid, usage['rss'], details or '-')
@@ -0,0 +1,172 @@
+"""
+Schema input applicant, dikompilasi sekali dari data training saat model dimuat.
+
+Tiap field punya tipe (angka / kategori), level kategori yang dikenal model,
+rentang angka yang masuk akal, dan boleh tidaknya null (hanya kolom yang memang
+punya nilai kosong di data training; nilainya diimputasi saat encoding).
+Payload divalidasi sebelum encoding supaya input rusak ditolak dengan 400
+per field / per baris tanpa menyentuh jalur scoring.
+"""
+import numpy as np
+
+# Rentang angka = [min, max] data training diperlebar sekian kali span-nya
+# (batas bawah tetap 0 untuk kolom yang tidak pernah negatif)
+RANGE_MARGIN = 1.0
+
+_FAST_NUMERIC_TYPES = {int, float, type(None)}
+
+
+def _error(field, code, message, **extra):
+    return {'field': field, 'error': code, 'message': message, **extra}
+
+
+class InputSchema:
+    """Aturan validasi per field: field angka dulu, lalu field kategori"""
+
+    def __init__(self, numeric, categorical):
+        # numeric: [(col, min, max, nullable)]; categorical: [(col, levels, nullable)]
+        self.numeric = numeric
+        self.categorical = categorical
+        self._level_sets = {col: set(levels) for col, levels, _ in categorical}
+        self._level_arrays = {col: np.array(levels, dtype=object) for col, levels, _ in categorical}
+
+    @classmethod
+    def compile(cls, model, dataset):
+        """Bangun schema dari model (kolom, level kategori) dan dataset training (rentang, null)"""
+        numeric, categorical = [], []
+        for col in model.feature_columns:
+            values = dataset.columns[col]
+            if col in model.categorical_levels:
+                categorical.append((col, list(model.categorical_levels[col]), bool((values < 0).any())))
+                continue
+            values = values.astype(np.float64)
+            nullable = bool(np.isnan(values).any())
+            low, high = float(np.nanmin(values)), float(np.nanmax(values))
+            margin = RANGE_MARGIN * (high - low)
+            numeric.append((col, 0.0 if low >= 0 else low - margin, high + margin, nullable))
+        return cls(numeric, categorical)
+
+    def describe(self):
+        """Schema dalam bentuk JSON (untuk dokumentasi / client)"""
+        fields = {col: {'type': 'number', 'min': low, 'max': high, 'nullable': nullable}
+                  for col, low, high, nullable in self.numeric}
+        fields.update({col: {'type': 'category', 'levels': levels, 'nullable': nullable}
+                       for col, levels, nullable in self.categorical})
+        return fields
+
+    # ---- pesan error (sama untuk jalur satu record dan batch) ----
+
+    @staticmethod
+    def _missing(col):
+        return _error(col, 'missing', f'Field "{col}" diperlukan')
+
+    @staticmethod
+    def _null(col):
+        return _error(col, 'null', f'Field "{col}" tidak boleh kosong')
+
+    @staticmethod
+    def _not_number(col):
+        return _error(col, 'type', f'Field "{col}" harus berupa angka')
+
+    @staticmethod
+    def _out_of_range(col, low, high):
+        return _error(col, 'range', f'Field "{col}" harus di antara {low:g} dan {high:g}', min=low, max=high)
+
+    @staticmethod
+    def _unknown_level(col, levels):
+        return _error(col, 'level', f'Field "{col}" harus salah satu dari: {", ".join(levels)}', levels=levels)
+
+    @staticmethod
+    def _to_float(value):
+        """float untuk angka / string angka; None kalau tipe tidak valid (bool, list, dict, ...).
+
+        String "nan" / "inf" bukan angka (null hanya lewat JSON null), supaya
+        NaN tidak lolos sebagai null lalu masuk ke vektor tanpa imputasi.
+        """
+        if value is None:
+            return np.nan
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            return None
+        try:
+            number = float(value)
+        except (ValueError, OverflowError):
+            return None
+        if isinstance(value, str) and not np.isfinite(number):
+            return None
+        return number
+
+    def validate(self, record):
+        """Validasi satu record (dict); return list error (kosong kalau valid)"""
+        errors = []
+        for col, low, high, nullable in self.numeric:
+            if col not in record:
+                errors.append(self._missing(col))
+                continue
+            value = self._to_float(record[col])
+            if value is None:
+                errors.append(self._not_number(col))
+            elif value != value:
+                if not nullable:
+                    errors.append(self._null(col))
+            elif not low <= value <= high:
+                errors.append(self._out_of_range(col, low, high))
+        for col, levels, nullable in self.categorical:
+            if col not in record:
+                errors.append(self._missing(col))
+            elif record[col] is None:
+                if not nullable:
+                    errors.append(self._null(col))
+            elif not isinstance(record[col], str) or record[col] not in self._level_sets[col]:
+                errors.append(self._unknown_level(col, levels))
+        return errors
+
+    def validate_many(self, records):
+        """Validasi list record (dict) per kolom secara vectorized.
+
+        Return {index: list error} hanya untuk record yang tidak valid; urutan
+        error per record sama dengan validate().
+        """
+        n = len(records)
+        found = [[] for _ in range(n)]
+        for col, low, high, nullable in self.numeric:
+            values = [record.get(col) for record in records]
+            missing = np.fromiter((col not in record for record in records), dtype=bool, count=n)
+            array = None
+            if set(map(type, values)) <= _FAST_NUMERIC_TYPES:
+                try:
+                    array = np.array(values, dtype=np.float64)
+                    bad_type = np.zeros(n, dtype=bool)
+                except OverflowError:
+                    pass  # integer di luar jangkauan float: tangani per elemen
+            if array is None:
+                # Ada string / tipe lain: konversi per elemen
+                converted = [self._to_float(value) for value in values]
+                bad_type = np.fromiter((value is None for value in converted), dtype=bool, count=n)
+                array = np.array([np.nan if value is None else value for value in converted], dtype=np.float64)
+            null = np.isnan(array) & ~missing & ~bad_type
+            with np.errstate(invalid='ignore'):
+                out_of_range = ~np.isnan(array) & ~((array >= low) & (array <= high))
+            for i in np.flatnonzero(missing):
+                found[i].append(self._missing(col))
+            for i in np.flatnonzero(bad_type):
+                found[i].append(self._not_number(col))
+            if not nullable:
+                for i in np.flatnonzero(null):
+                    found[i].append(self._null(col))
+            for i in np.flatnonzero(out_of_range):
+                found[i].append(self._out_of_range(col, low, high))
+
+        for col, levels, nullable in self.categorical:
+            values = np.fromiter((record.get(col) for record in records), dtype=object, count=n)
+            missing = np.fromiter((col not in record for record in records), dtype=bool, count=n)
+            null = np.equal(values, None) & ~missing
+            known = np.isin(values, self._level_arrays[col])
+            for i in np.flatnonzero(missing):
+                found[i].append(self._missing(col))
+            if not nullable:
+                for i in np.flatnonzero(null):
+                    found[i].append(self._null(col))
+            for i in np.flatnonzero(~known & ~missing & ~null):
+                found[i].append(self._unknown_level(col, levels))
+
+        return {i: errors for i, errors in enumerate(found) if errors}
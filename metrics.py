@@ -0,0 +1,256 @@
+"""
+Metrics ringan dengan format teks Prometheus (tanpa dependency tambahan).
+
+Counter, gauge, dan histogram disimpan di memory proses. Setiap worker
+gunicorn menulis snapshot-nya ke METRICS_DIR dari thread latar (tiap interval),
+lalu endpoint /metrics menggabungkan snapshot semua worker yang masih hidup
+sehingga angka yang di-scrape tidak bergantung worker mana yang menjawab.
+"""
+import os
+import json
+import time
+import bisect
+import threading
+
+# Bucket default (detik) untuk latency request dan tahap di hot path
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def write_snapshot(snapshot_dir, snapshot):
+    """Tulis snapshot satu proses ke snapshot_dir/<pid>.json secara atomic (raise OSError)"""
+    path = os.path.join(snapshot_dir, f"{snapshot['pid']}.json")
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def clear_snapshots(snapshot_dir):
+    """Hapus snapshot proses sebelumnya di snapshot_dir.
+
+    Dipanggil master sebelum worker start: pid worker lama bisa dipakai ulang
+    proses lain setelah restart, sehingga counter lamanya ikut terbaca lagi.
+    """
+    if not snapshot_dir or not os.path.isdir(snapshot_dir):
+        return 0
+    removed = 0
+    for filename in os.listdir(snapshot_dir):
+        if filename.endswith(('.json', '.tmp')):
+            try:
+                os.remove(os.path.join(snapshot_dir, filename))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def live_snapshots(snapshot_dir, own_snapshot):
+    """Snapshot proses ini + snapshot worker lain di snapshot_dir yang prosesnya masih hidup"""
+    snapshots = {own_snapshot['pid']: own_snapshot}
+    if not snapshot_dir or not os.path.isdir(snapshot_dir):
+        return list(snapshots.values())
+    for filename in os.listdir(snapshot_dir):
+        if not filename.endswith('.json'):
+            continue
+        pid = int(filename[:-5]) if filename[:-5].isdigit() else None
+        if pid is None or pid in snapshots:
+            continue
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            continue  # worker sudah mati
+        except PermissionError:
+            pass
+        try:
+            with open(os.path.join(snapshot_dir, filename)) as f:
+                snapshots[pid] = json.load(f)
+        except (OSError, ValueError):
+            continue
+    return list(snapshots.values())
+
+
+class SnapshotFlusher:
+    """State per proses yang ditulis berkala ke snapshot_dir/<pid>.json dari thread latar.
+
+    Subclass mengimplementasikan snapshot() dan menandai self._dirty saat
+    state berubah (di bawah self._lock).
+    """
+
+    # Nama untuk thread flusher dan pesan error
+    kind = 'snapshot'
+
+    def __init__(self, snapshot_dir=None, flush_interval=1.0):
+        self._lock = threading.Lock()
+        self.snapshot_dir = snapshot_dir
+        self.flush_interval = flush_interval
+        self._dirty = False
+        self._flusher_pid = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        """Lock dan thread flusher milik master tidak ikut ke worker hasil fork"""
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def snapshot(self):
+        raise NotImplementedError
+
+    def flush(self):
+        """Tulis snapshot proses ini ke snapshot_dir (atomic)"""
+        if not self.snapshot_dir:
+            return
+        self._dirty = False
+        try:
+            write_snapshot(self.snapshot_dir, self.snapshot())
+        except OSError as e:
+            # Jangan sampai snapshot menggagalkan request: lanjut per proses saja
+            print(f"! Gagal menulis snapshot {self.kind} ({e}) - {self.kind} hanya per proses")
+            self.snapshot_dir = None
+
+    def ensure_flusher(self):
+        """Start thread yang menulis snapshot tiap flush_interval (sekali per proses)"""
+        if not self.snapshot_dir or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+
+        def run():
+            while self.snapshot_dir:
+                time.sleep(self.flush_interval)
+                if self._dirty:
+                    self.flush()
+
+        threading.Thread(target=run, name=f'{self.kind}-flush', daemon=True).start()
+
+
+class Metrics(SnapshotFlusher):
+    """Registry metrics satu proses"""
+
+    kind = 'metrics'
+
+    def __init__(self, snapshot_dir=None, flush_interval=1.0):
+        super().__init__(snapshot_dir, flush_interval)
+        # name -> (type, help, buckets)
+        self.definitions = {}
+        # (name, labels) -> value / [bucket_counts, sum, count]
+        self.values = {}
+
+    def _reset_after_fork(self):
+        """Worker hasil fork (gunicorn --preload) mulai dari counter nol.
+
+        Gauge (mis. versi model yang di-load master) tetap dipertahankan.
+        """
+        super()._reset_after_fork()
+        self._dirty = True
+        self.values = {key: value for key, value in self.values.items()
+                       if self.definitions.get(key[0], ('',))[0] == 'gauge'}
+
+    def counter(self, name, help_text):
+        self.definitions[name] = ('counter', help_text, None)
+
+    def gauge(self, name, help_text):
+        self.definitions[name] = ('gauge', help_text, None)
+
+    def histogram(self, name, help_text, buckets=REQUEST_BUCKETS):
+        self.definitions[name] = ('histogram', help_text, tuple(buckets))
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + value
+            self._dirty = True
+
+    def set(self, name, value, labels=()):
+        with self._lock:
+            self.values[(name, labels)] = value
+            self._dirty = True
+
+    def observe(self, name, value, labels=()):
+        buckets = self.definitions[name][2]
+        key = (name, labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            # Bucket non-kumulatif di sini, dijumlahkan saat render
+            state[0][bisect.bisect_left(buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+            self._dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            values = [[name, [list(pair) for pair in labels],
+                       [list(v[0]), v[1], v[2]] if isinstance(v, list) else v]
+                      for (name, labels), v in self.values.items()]
+        return {'pid': os.getpid(), 'time': time.time(), 'values': values}
+
+    def render(self):
+        """Gabungkan snapshot semua worker dan render format teks Prometheus"""
+        merged = {}
+        for snapshot in live_snapshots(self.snapshot_dir, self.snapshot()):
+            for name, labels, value in snapshot['values']:
+                if name not in self.definitions:
+                    continue
+                key = (name, tuple(tuple(pair) for pair in labels))
+                kind = self.definitions[name][0]
+                if kind == 'histogram':
+                    state = merged.setdefault(key, [[0] * len(value[0]), 0.0, 0])
+                    state[0] = [a + b for a, b in zip(state[0], value[0])]
+                    state[1] += value[1]
+                    state[2] += value[2]
+                elif kind == 'gauge':
+                    merged[key] = max(merged.get(key, value), value)
+                else:
+                    merged[key] = merged.get(key, 0) + value
+
+        lines = []
+        for name, (kind, help_text, buckets) in self.definitions.items():
+            series = sorted((labels, value) for (metric, labels), value in merged.items() if metric == name)
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in series:
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for upper, bucket_count in zip(list(buckets) + [float('inf')], counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", _format_value(upper))])} '
+                                 f'{cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+class StageTimer:
+    """Catat durasi tahap-tahap berurutan di hot path (satu perf_counter per tahap)"""
+
+    __slots__ = ('stages', '_last')
+
+    def __init__(self):
+        self.stages = []
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
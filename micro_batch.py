@@ -0,0 +1,103 @@
+"""
+Micro-batching request /api/predict yang datang bersamaan.
+
+Dengan worker gthread beberapa request diproses paralel dalam satu proses.
+Request pertama yang sampai di tahap scoring menjadi "leader": ia menunggu
+paling lama max_wait detik (atau sampai batch penuh / tidak ada request lain
+yang sedang menuju tahap scoring), lalu memproses semua item yang terkumpul
+dalam satu panggilan vectorized. Request lain cukup menunggu hasilnya.
+Tanpa request bersamaan leader tidak menunggu sama sekali.
+"""
+import time
+import threading
+
+
+class _Slot:
+    __slots__ = ('item', 'result', 'error', 'done', 'wakeup')
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = False
+        # Di-set saat hasil siap, atau saat slot ini ditunjuk jadi leader berikutnya
+        self.wakeup = threading.Event()
+
+
+class MicroBatcher:
+    """Gabungkan item dari beberapa thread ke satu panggilan process(items) -> results"""
+
+    def __init__(self, process, max_wait=0.002, max_batch=64):
+        self.process = process
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending = []
+        self._leader_active = False
+        # Request yang sudah masuk route tapi belum submit
+        self._incoming = 0
+
+    def announce(self):
+        """Tandai request baru yang (kemungkinan) akan submit"""
+        with self._cond:
+            self._incoming += 1
+
+    def withdraw(self):
+        """Request yang sudah announce keluar tanpa submit (error / cache hit)"""
+        with self._cond:
+            self._incoming -= 1
+            self._cond.notify()
+
+    def submit(self, item, announced=True):
+        """Proses item (bersama item dari thread lain) dan return hasilnya"""
+        slot = _Slot(item)
+        with self._cond:
+            if announced:
+                self._incoming -= 1
+            self._pending.append(slot)
+            # Hanya leader yang menunggu di condition; follower menunggu event slot-nya
+            is_leader = not self._leader_active
+            self._leader_active = True
+            self._cond.notify()
+
+        while True:
+            if not is_leader:
+                slot.wakeup.wait()
+                slot.wakeup.clear()
+                if slot.done:
+                    break
+
+            with self._cond:
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_batch and self._incoming > 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+
+            try:
+                results = self.process([pending.item for pending in batch])
+                errors = [None] * len(batch)
+            except Exception as e:
+                results, errors = [None] * len(batch), [e] * len(batch)
+
+            with self._cond:
+                for pending, result, error in zip(batch, results, errors):
+                    pending.result, pending.error, pending.done = result, error, True
+                if self._pending:
+                    # Sisa item (batch penuh / datang saat diproses): serahkan ke leader berikutnya
+                    self._pending[0].wakeup.set()
+                else:
+                    self._leader_active = False
+            for pending in batch:
+                if pending is not slot:
+                    pending.wakeup.set()
+            if slot.done:
+                break
+            is_leader = False
+
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
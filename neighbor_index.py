@@ -0,0 +1,195 @@
+"""
+Index k-nearest-neighbour applicant historis di ruang fitur terstandardisasi.
+
+Baris dataset di-scale dengan scaler model lalu dikelompokkan per cluster,
+dan tiap cluster dipecah lagi menjadi sel kecil (~CELL_SIZE baris, k-means
+NumPy sederhana) yang disimpan kontigu beserta pusat dan radiusnya. Untuk
+semua titik y di sel c berlaku ||x - y|| >= ||x - pusat_c|| - radius_c
+(ketaksamaan segitiga). Di 22 dimensi pruning murni per sel masih menyisakan
+sebagian besar baris, jadi query dibagi dua: sel dengan lower bound terkecil
+memberi batas atas jarak tetangga ke-k, lalu satu scan float32 (norm kuadrat
+dihitung sekali) menyaring baris yang mungkin di bawah batas itu, dan hanya
+kandidat tersebut yang jaraknya dihitung ulang exact dalam float64.
+
+Index disimpan sebagai .npz dan dibangun ulang kalau versi model / jumlah
+baris dataset berubah.
+"""
+import os
+import json
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, 'models', 'neighbors.npz')
+
+# Naikkan kalau layout .npz berubah, file lama otomatis dianggap basi
+INDEX_FORMAT_VERSION = 1
+
+# Target jumlah baris per sel dan iterasi k-means saat membangun sel
+CELL_SIZE = 256
+CELL_ITERATIONS = 10
+# Fase pertama query: sel terdekat sampai minimal sekian baris untuk batas atas jarak ke-k
+INITIAL_CANDIDATES = 512
+# Margin relatif untuk error pembulatan scan float32 (terhadap skala norm kuadrat),
+# beberapa kali di atas batas error dot product float32 22 dimensi (~2e-6)
+FLOAT32_MARGIN = 1e-5
+
+
+def _kmeans_cells(X, n_cells, random_state=42):
+    """Lloyd k-means ringan (NumPy saja) untuk memecah satu cluster menjadi sel"""
+    if n_cells <= 1:
+        return np.zeros(len(X), dtype=np.int64)
+    rng = np.random.RandomState(random_state)
+    centers = X[rng.choice(len(X), n_cells, replace=False)]
+    sq_norms = np.einsum('ij,ij->i', X, X)
+    for _ in range(CELL_ITERATIONS):
+        sq = sq_norms[:, np.newaxis] - 2.0 * (X @ centers.T) + np.einsum('ij,ij->i', centers, centers)
+        labels = np.argmin(sq, axis=1)
+        counts = np.bincount(labels, minlength=n_cells)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, X)
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, np.newaxis]
+    return labels
+
+
+class NeighborIndexError(Exception):
+    """File index tidak ada, rusak, atau basi terhadap model / dataset"""
+
+
+class NeighborIndex:
+    """Brute-force per sel (di dalam tiap cluster) dengan pruning radius"""
+
+    def __init__(self, points, rows, offsets, centers, radii, meta):
+        # points: baris ter-scale diurutkan per sel; rows: index baris dataset asal;
+        # sel i = points[offsets[i]:offsets[i + 1]]
+        self.points = points
+        self.rows = rows
+        self.offsets = offsets
+        self.centers = centers
+        self.radii = radii
+        self.model_version = meta['model_version']
+        self.n_rows = meta['n_rows']
+        self.sq_norms = np.einsum('ij,ij->i', points, points)
+        # Salinan float32 untuk scan penyaring: setengah norm kuadrat - p.x <= batas
+        self.points32 = points.astype(np.float32)
+        self.half_sq_norms32 = (0.5 * self.sq_norms).astype(np.float32)
+        self.max_sq_norm = float(self.sq_norms.max()) if len(self.sq_norms) else 0.0
+        for array in (self.points, self.rows, self.offsets, self.centers, self.radii, self.sq_norms,
+                      self.points32, self.half_sq_norms32):
+            array.flags.writeable = False
+
+    @classmethod
+    def build(cls, model, dataset):
+        """Bangun index dari dataset (nilai kosong diimputasi seperti saat fit)"""
+        X_scaled = model.scale(model.encode_columns(dataset))
+        labels = model.assign_scaled(X_scaled)
+
+        order_parts, offsets, centers, radii = [], [0], [], []
+        for cluster_id in range(model.n_clusters):
+            members = np.flatnonzero(labels == cluster_id)
+            if not len(members):
+                continue
+            cells = _kmeans_cells(X_scaled[members], max(1, round(len(members) / CELL_SIZE)))
+            for cell_id in np.unique(cells):
+                cell_members = members[cells == cell_id]
+                center = X_scaled[cell_members].mean(axis=0)
+                order_parts.append(cell_members)
+                offsets.append(offsets[-1] + len(cell_members))
+                centers.append(center)
+                radii.append(np.linalg.norm(X_scaled[cell_members] - center, axis=1).max())
+
+        order = np.concatenate(order_parts)
+        meta = {'model_version': model.version, 'n_rows': len(dataset)}
+        return cls(np.ascontiguousarray(X_scaled[order]), order.astype(np.int32), np.array(offsets),
+                   np.array(centers), np.array(radii), meta)
+
+    def _cell_rows(self, cells):
+        """Index baris (di points) dari sel-sel terpilih"""
+        return np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in cells])
+
+    def _nearest(self, candidate_index, x_scaled, x_sq_norm, k):
+        sq = self.sq_norms[candidate_index] - 2.0 * (self.points[candidate_index] @ x_scaled) + x_sq_norm
+        if len(sq) > k:
+            keep = np.argpartition(sq, k - 1)[:k]
+            return candidate_index[keep], sq[keep]
+        return candidate_index, sq
+
+    def query(self, x_scaled, k):
+        """k tetangga terdekat satu vektor ter-scale: return (rows, distances) terurut"""
+        k = min(k, len(self.rows))
+        x_scaled = np.asarray(x_scaled, dtype=np.float64)
+        x_sq_norm = float(x_scaled @ x_scaled)
+        lower_bounds = np.linalg.norm(self.centers - x_scaled, axis=1) - self.radii
+        cell_order = np.argsort(lower_bounds)
+        cell_sizes = np.diff(self.offsets)[cell_order]
+
+        # Fase 1: sel dengan lower bound terkecil sampai cukup kandidat -> estimasi jarak ke-k
+        n_first = int(np.searchsorted(np.cumsum(cell_sizes), max(k, INITIAL_CANDIDATES))) + 1
+        best_index, best_sq = self._nearest(self._cell_rows(cell_order[:n_first]), x_scaled, x_sq_norm, k)
+
+        # Fase 2: scan float32 semua baris, simpan yang mungkin lebih dekat dari batas atas
+        if len(best_sq) == k:
+            margin = FLOAT32_MARGIN * (self.max_sq_norm + x_sq_norm)
+            bound = 0.5 * (best_sq.max() - x_sq_norm) + margin
+            scores = self.half_sq_norms32 - self.points32 @ x_scaled.astype(np.float32)
+            best_index = np.flatnonzero(scores <= bound)
+            if len(best_index) > k:
+                # Perketat batas dengan skor ke-k di antara kandidat (masih float32 + margin)
+                candidate_scores = scores[best_index]
+                kth_score = np.partition(candidate_scores, k - 1)[k - 1]
+                best_index = best_index[candidate_scores <= kth_score + 2 * margin]
+
+        # Jarak akhir dihitung ulang langsung supaya bebas error pembulatan rumus norm
+        exact = np.linalg.norm(self.points[best_index] - x_scaled, axis=1)
+        ranking = np.argsort(exact, kind='stable')[:k]
+        return self.rows[best_index[ranking]], exact[ranking]
+
+    def save(self, path):
+        """Simpan index ke .npz secara atomic (tulis tmp lalu rename)"""
+        meta = {'format_version': INDEX_FORMAT_VERSION, 'model_version': self.model_version,
+                'n_rows': self.n_rows}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), points=self.points, rows=self.rows,
+                     offsets=self.offsets, centers=self.centers, radii=self.radii)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, model_version=None, n_rows=None):
+        """Muat index; raise NeighborIndexError kalau tidak valid atau basi"""
+        if not os.path.exists(path):
+            raise NeighborIndexError(f"Neighbor index tidak ditemukan: {path}")
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                arrays = {name: data[name] for name in ('points', 'rows', 'offsets', 'centers', 'radii')}
+        except (OSError, KeyError, ValueError) as e:
+            raise NeighborIndexError(f"Neighbor index tidak bisa dibaca: {e}") from e
+
+        if meta.get('format_version') != INDEX_FORMAT_VERSION:
+            raise NeighborIndexError(
+                f"Format neighbor index v{meta.get('format_version')} != v{INDEX_FORMAT_VERSION}")
+        if model_version is not None and meta['model_version'] != model_version:
+            raise NeighborIndexError("Neighbor index basi (versi model berubah)")
+        if n_rows is not None and meta['n_rows'] != n_rows:
+            raise NeighborIndexError("Neighbor index basi (jumlah baris dataset berubah)")
+        return cls(meta=meta, **arrays)
+
+
+def load_or_build(path, model, dataset):
+    """Muat index tersimpan untuk model + dataset ini, atau bangun lalu simpan"""
+    try:
+        return NeighborIndex.load(path, model.version, len(dataset))
+    except NeighborIndexError as e:
+        print(f"! {e} - membangun ulang index")
+
+    index = NeighborIndex.build(model, dataset)
+    try:
+        index.save(path)
+        print(f"✓ Neighbor index tersimpan: {path}")
+    except OSError as e:
+        print(f"! Gagal menyimpan neighbor index: {e}")
+    return index
@@ -0,0 +1,134 @@
+"""
+Cache hasil prediksi untuk payload applicant yang berulang.
+
+Key adalah hash nilai feature_columns yang sudah dikanonikalisasi (numeric
+sebagai float, urutan kolom tetap) ditambah versi model, sehingga retry dengan
+payload identik langsung memakai hasil sebelumnya tanpa encoding. Cache lokal
+berupa LRU dengan batas ukuran + TTL; opsional ada backend SQLite bersama
+(WAL) supaya hit juga berlaku antar worker gunicorn.
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from sqlite_local import LocalConnection
+
+# Hapus baris SQLite yang kadaluarsa / berlebih setiap sekian kali put
+SHARED_TRIM_EVERY = 256
+SCHEMA = ('CREATE TABLE IF NOT EXISTS predictions ('
+          'key TEXT PRIMARY KEY, version TEXT, value TEXT, expires_at REAL)')
+
+
+class PredictionCache:
+    """LRU + TTL per proses, opsional diteruskan ke file SQLite bersama"""
+
+    def __init__(self, max_size=10000, ttl=300.0, sqlite_path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sqlite_path = sqlite_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = LocalConnection(sqlite_path, SCHEMA, timeout=1.0) if sqlite_path else None
+        self._puts = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def key(self, model, record, variant=''):
+        """Hash kanonik nilai fitur record, atau None kalau tidak bisa di-cache.
+
+        variant membedakan bentuk response untuk input yang sama (mis. dengan membership).
+        """
+        if not self.enabled:
+            return None
+        values = []
+        try:
+            for col in model.feature_columns:
+                value = record[col]
+                if col in model.categorical_levels or value is None:
+                    values.append(value)
+                else:
+                    # 25, 25.0 dan "25" di-encode sama, jadi key-nya juga sama
+                    values.append(float(value))
+            canonical = json.dumps([model.version, variant, values], separators=(',', ':'))
+        except (KeyError, TypeError, ValueError):
+            return None  # biarkan jalur normal yang melaporkan error-nya
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """Return (prediksi, 'local' / 'shared'), atau (None, None) kalau miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], 'local'
+                del self._entries[key]
+
+        value = self._shared_get(key)
+        if value is not None:
+            self._local_put(key, value)
+            with self._lock:
+                self.hits += 1
+            return value, 'shared'
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def put(self, key, value, version=None):
+        self._local_put(key, value)
+        self._shared_put(key, value, version)
+
+    def clear(self, version=None):
+        """Kosongkan cache lokal; di SQLite hapus entry milik versi model lain"""
+        with self._lock:
+            self._entries.clear()
+        if self.sqlite_path and version is not None:
+            try:
+                self._db.connection().execute('DELETE FROM predictions WHERE version != ?', (version,))
+            except (sqlite3.Error, OSError) as e:
+                print(f"! Gagal membersihkan cache prediksi bersama: {e}")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _local_put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _shared_get(self, key):
+        if not self.sqlite_path:
+            return None
+        try:
+            row = self._db.connection().execute(
+                'SELECT value FROM predictions WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            return None  # cache bersama sibuk / rusak: anggap miss
+        return json.loads(row[0]) if row else None
+
+    def _shared_put(self, key, value, version):
+        if not self.sqlite_path:
+            return
+        try:
+            conn = self._db.connection()
+            conn.execute('INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)',
+                         (key, version, json.dumps(value), time.time() + self.ttl))
+            self._puts += 1
+            if self._puts % SHARED_TRIM_EVERY == 0:
+                conn.execute('DELETE FROM predictions WHERE expires_at <= ?', (time.time(),))
+                conn.execute('DELETE FROM predictions WHERE key IN (SELECT key FROM predictions '
+                             'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)', (self.max_size,))
+        except (sqlite3.Error, OSError):
+            pass
@@ -0,0 +1,174 @@
+"""
+Scoring file offline dengan model bundle (tanpa Flask).
+
+Input mengikuti skema credit_risk_dataset.csv (CSV atau Parquet), dibaca per
+chunk sehingga memory tetap datar untuk file yang jauh lebih besar dari RAM.
+Setiap chunk di-impute / one-hot / scale persis seperti saat fit, di-assign
+ke cluster terdekat, lalu langsung ditulis ke output (CSV atau Parquet).
+
+Contoh:
+    python score_file.py credit_risk_dataset.csv scored.csv
+    python score_file.py applicants.csv scored.parquet --chunksize 100000 --workers 4
+"""
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import credit_model
+
+# Model per proses worker (diisi oleh _init_worker)
+_worker_model = None
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        sys.exit("✗ Format Parquet butuh pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def iter_chunks(path, chunksize):
+    """Baca input per chunk sebagai DataFrame"""
+    if path.endswith('.parquet'):
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def score_chunk(chunk, model):
+    """Tambahkan kolom hasil scoring ke satu chunk"""
+    missing = [col for col in model.feature_columns if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom input tidak lengkap: {missing}")
+
+    X = model.encode_columns(chunk, impute=True)
+    distances = model.distances(X)
+    nearest = np.argmin(distances, axis=1)
+
+    cluster_ids = sorted(model.cluster_stats)
+    default_rates = np.array([model.cluster_stats[c]['default_rate'] for c in cluster_ids])
+    recommendations = np.array([credit_model.recommend(model.cluster_stats[c]['approval_rate'])[0]
+                                for c in cluster_ids], dtype=object)
+
+    scored = chunk.copy()
+    scored['Cluster'] = nearest
+    scored['distance_to_centroid'] = distances[np.arange(len(nearest)), nearest]
+    scored['default_rate'] = default_rates[nearest]
+    scored['recommendation'] = recommendations[nearest]
+    return scored
+
+
+def _init_worker(bundle_path):
+    global _worker_model
+    _worker_model = credit_model.load_bundle(bundle_path)
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, _worker_model)
+
+
+def score_chunks(chunks, bundle_path, workers=1):
+    """Scoring chunk berurutan; dengan workers > 1 pakai process pool.
+
+    Jumlah chunk yang sedang diproses dibatasi (2x workers) supaya memory
+    tidak naik walaupun pembacaan lebih cepat dari scoring.
+    """
+    if workers <= 1:
+        model = credit_model.load_bundle(bundle_path)
+        for chunk in chunks:
+            yield score_chunk(chunk, model)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(bundle_path,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class CsvChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='w' if self.header else 'a', header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class ParquetChunkWriter:
+    def __init__(self, path, float_columns):
+        self.pa = _require_pyarrow()
+        self.path = path
+        # Kolom numeric selalu float64 supaya schema sama di semua chunk
+        self.float_columns = float_columns
+        self.writer = None
+
+    def write(self, frame):
+        frame = frame.astype({col: 'float64' for col in self.float_columns if col in frame})
+        table = self.pa.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+        elif table.schema != self.writer.schema:
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scoring file CSV/Parquet dengan model bundle')
+    parser.add_argument('input', help='File input (skema credit_risk_dataset.csv)')
+    parser.add_argument('output', help='File output (.csv atau .parquet)')
+    parser.add_argument('--model', default=credit_model.DEFAULT_BUNDLE_PATH,
+                        help='Path model bundle (build: python credit_model.py)')
+    parser.add_argument('--chunksize', type=int, default=50000, help='Jumlah baris per chunk')
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah proses scoring paralel')
+    args = parser.parse_args(argv)
+
+    try:
+        model = credit_model.load_bundle(args.model)
+    except credit_model.BundleError as e:
+        sys.exit(f"✗ {e} (jalankan: python credit_model.py)")
+    print(f"✓ Model bundle loaded: {args.model} (version {model.version})")
+
+    if args.output.endswith('.parquet'):
+        numeric_cols = [col for col in model.feature_columns if col not in model.categorical_cols]
+        writer = ParquetChunkWriter(args.output, numeric_cols)
+    else:
+        writer = CsvChunkWriter(args.output)
+
+    start = time.perf_counter()
+    n_rows = 0
+    try:
+        for scored in score_chunks(iter_chunks(args.input, args.chunksize), args.model, args.workers):
+            writer.write(scored)
+            n_rows += len(scored)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Scored {n_rows} rows -> {args.output}")
+    print(f"  - Waktu: {elapsed:.2f} s ({n_rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Koneksi SQLite per thread untuk file yang dibagi semua worker gunicorn.
+
+Koneksi sqlite3 tidak boleh dipakai lintas thread maupun setelah fork, jadi
+tiap thread di tiap proses membuka koneksinya sendiri (lazy, sekali) dengan
+mode WAL supaya pembaca tidak menunggu penulis dari worker lain.
+"""
+import os
+import sqlite3
+import threading
+
+
+class LocalConnection:
+    """Satu file SQLite + skema tabel; connection() return koneksi milik thread pemanggil"""
+
+    def __init__(self, path, schema, timeout=5.0):
+        self.path = path
+        self.schema = schema
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def connection(self):
+        """Koneksi SQLite per thread (dan per proses: koneksi tidak boleh dipakai setelah fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(self.schema)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,78 @@
+"""
+Regression: input yang lolos validasi tidak boleh menghasilkan NaN di jalur scoring.
+
+String "nan" / "NaN" sempat dianggap null oleh schema (lolos untuk kolom
+nullable) tetapi tidak diimputasi oleh encode(), sehingga /api/predict
+mengembalikan distance_to_centroid NaN (JSON tidak valid).
+"""
+import os
+import sys
+import json
+
+import numpy as np
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+NULLABLE_COLUMNS = ('loan_int_rate', 'person_emp_length')
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('app')
+    os.environ.update(GENERATE_VISUALIZATIONS='0', METRICS_DIR='', DRIFT_DIR='',
+                      CONTACTS_DB_PATH=str(tmp / 'contacts.sqlite'))
+    import app
+    assert app.state is not None
+    return app
+
+
+@pytest.fixture(scope='module')
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture(scope='module')
+def applicant(app_module, client):
+    sample = json.loads(client.get('/api/sample-data').data)['approved'][0]
+    return {col: sample[col] for col in app_module.state.model.feature_columns}
+
+
+@pytest.mark.parametrize('col', NULLABLE_COLUMNS)
+@pytest.mark.parametrize('text', ['nan', 'NaN', 'inf', '-Infinity'])
+def test_schema_rejects_non_finite_strings(app_module, applicant, col, text):
+    record = dict(applicant, **{col: text})
+    errors = app_module.state.input_schema.validate(record)
+    assert [error['error'] for error in errors] == ['type']
+    assert app_module.state.input_schema.validate_many([applicant, record]) == {1: errors}
+
+
+@pytest.mark.parametrize('col', NULLABLE_COLUMNS)
+def test_null_is_still_imputed(app_module, applicant, col):
+    record = dict(applicant, **{col: None})
+    assert app_module.state.input_schema.validate(record) == []
+    assert np.isfinite(app_module.state.model.encode(record)).all()
+
+
+def test_encode_imputes_nan_string(app_module, applicant):
+    # encode() dipakai juga tanpa schema (score_file, admin update)
+    vector = app_module.state.model.encode(dict(applicant, loan_int_rate='nan'))
+    assert np.isfinite(vector).all()
+    columns = {col: [value] for col, value in dict(applicant, loan_int_rate='nan').items()}
+    assert np.isfinite(app_module.state.model.encode_columns(columns)).all()
+
+
+def test_predict_rejects_nan_string(client, applicant):
+    response = client.post('/api/predict', json=dict(applicant, loan_int_rate='nan'))
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['field'] == 'loan_int_rate'
+
+
+def test_batch_rejects_nan_string_per_row(client, applicant):
+    response = client.post('/api/predict/batch', json=[applicant, dict(applicant, person_emp_length='NaN')])
+    assert response.status_code == 200
+    # Response harus JSON standar (tanpa NaN)
+    body = json.loads(response.get_data(as_text=True), parse_constant=pytest.fail)
+    assert [result['success'] for result in body['results']] == [True, False]
+    assert np.isfinite(body['results'][0]['prediction']['distance_to_centroid'])
@@ -0,0 +1,123 @@
+"""
+MicroBatcher: tiap thread mendapat hasil item-nya sendiri (termasuk saat batch
+penuh dan sisa item diserahkan ke leader berikutnya), dan hitungan request
+yang sudah announce kembali ke nol setelah submit / withdraw.
+"""
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from micro_batch import MicroBatcher
+
+
+class Recorder:
+    """process() yang mencatat ukuran tiap batch"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.batches.append(len(items))
+        time.sleep(self.delay)
+        return [item * 10 for item in items]
+
+
+def run_threads(n, target):
+    """Jalankan target(i) di n thread yang mulai bersamaan; return {i: hasil / exception}"""
+    results = {}
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = target(i)
+        except Exception as e:
+            results[i] = e
+
+    # daemon: thread yang macet menggagalkan test, bukan menggantung pytest
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+        assert not thread.is_alive(), 'thread macet menunggu hasil micro-batch'
+    return results
+
+
+def assert_idle(batcher):
+    assert batcher._incoming == 0
+    assert batcher._pending == []
+    assert not batcher._leader_active
+
+
+@pytest.mark.parametrize('n, max_batch', [(16, 64), (40, 4)])
+def test_each_caller_gets_its_own_result(n, max_batch):
+    process = Recorder(delay=0.001)
+    batcher = MicroBatcher(process, max_wait=0.05, max_batch=max_batch)
+
+    def request(i):
+        batcher.announce()
+        return batcher.submit(i)
+
+    results = run_threads(n, request)
+    assert results == {i: i * 10 for i in range(n)}
+    assert sum(process.batches) == n
+    assert max(process.batches) <= max_batch
+    # Request bersamaan benar-benar digabung
+    assert len(process.batches) < n
+    assert_idle(batcher)
+
+
+def test_withdraw_releases_waiting_leader():
+    process = Recorder()
+    # max_wait besar: leader hanya boleh selesai cepat kalau withdraw membangunkannya
+    batcher = MicroBatcher(process, max_wait=5.0)
+    n = 8
+
+    def request(i):
+        batcher.announce()
+        if i % 2:
+            time.sleep(0.05)
+            batcher.withdraw()  # mis. cache hit / validasi gagal
+            return None
+        return batcher.submit(i)
+
+    start = time.monotonic()
+    results = run_threads(n, request)
+    assert time.monotonic() - start < 2.0
+    assert results == {i: i * 10 if i % 2 == 0 else None for i in range(n)}
+    assert_idle(batcher)
+
+
+def test_unannounced_submit_does_not_wait():
+    process = Recorder()
+    batcher = MicroBatcher(process, max_wait=5.0)
+    start = time.monotonic()
+    assert batcher.submit(3, announced=False) == 30
+    assert time.monotonic() - start < 1.0
+    assert process.batches == [1]
+    assert_idle(batcher)
+
+
+def test_process_error_reaches_every_caller():
+    def failing(items):
+        raise ValueError('scoring gagal')
+
+    batcher = MicroBatcher(failing, max_wait=0.05)
+
+    def request(i):
+        batcher.announce()
+        return batcher.submit(i)
+
+    results = run_threads(6, request)
+    assert all(isinstance(result, ValueError) for result in results.values())
+    assert_idle(batcher)
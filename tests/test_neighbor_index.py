@@ -0,0 +1,59 @@
+"""
+NeighborIndex.query harus exact: hasilnya sama dengan brute force np.linalg.norm
+ke seluruh dataset tersimpan (pruning per sel dan scan float32 hanya menyaring).
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import credit_model
+from credit_dataset import load_dataset
+from neighbor_index import NeighborIndex
+
+CSV_PATH = os.path.join(ROOT_DIR, 'credit_risk_with_clusters.csv')
+
+
+@pytest.fixture(scope='module')
+def indexed():
+    dataset, csv_sha256 = load_dataset(CSV_PATH)
+    try:
+        model = credit_model.load_bundle(expected_sha256=csv_sha256)
+    except credit_model.BundleError as e:
+        pytest.skip(f"{e} (jalankan: python credit_model.py)")
+    index = NeighborIndex.build(model, dataset)
+    return index, model.scale(model.encode_columns(dataset))
+
+
+def queries(X_scaled):
+    rng = np.random.RandomState(0)
+    rows = X_scaled[rng.choice(len(X_scaled), 8, replace=False)]
+    # Titik di luar dataset: baris yang digeser dan titik jauh dari semua sel
+    shifted = rows + rng.normal(scale=0.5, size=rows.shape)
+    far = X_scaled.mean(axis=0) + 10 * X_scaled.std(axis=0)
+    return np.vstack([rows, shifted, far])
+
+
+@pytest.mark.parametrize('k', [1, 5, 10, 50, 600])
+def test_query_matches_brute_force(indexed, k):
+    index, X_scaled = indexed
+    for x in queries(X_scaled):
+        rows, distances = index.query(x, k)
+        brute = np.linalg.norm(X_scaled - x, axis=1)
+        assert len(rows) == len(set(rows.tolist())) == k
+        assert np.all(np.diff(distances) >= 0)
+        # Baris duplikat di dataset membuat tetangga yang seri boleh beda baris,
+        # tapi jaraknya harus persis jarak k terdekat brute force
+        np.testing.assert_allclose(distances, np.sort(brute)[:k], rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(brute[rows], distances, rtol=1e-12, atol=1e-12)
+
+
+def test_query_k_larger_than_dataset_is_clamped(indexed):
+    index, X_scaled = indexed
+    rows, distances = index.query(X_scaled[0], len(X_scaled) + 10)
+    assert len(rows) == len(X_scaled)
+    assert sorted(rows.tolist()) == list(range(len(X_scaled)))
@@ -0,0 +1,207 @@
+"""
+Analisis what-if satu applicant: grid perturbasi beberapa field sekaligus.
+
+Semua kombinasi nilai field yang diminta (produk kartesius) dibentuk langsung
+di satu matrix hasil encoding dari vektor applicant, ditambah satu garis per
+field yang hanya mengubah field itu (field lain tetap nilai applicant) dan
+baris applicant sendiri. Semuanya di-scale dan dihitung jaraknya ke centroid
+dalam satu pass.
+
+Di sepanjang garis field angka, selisih jarak kuadrat ke dua centroid linear
+terhadap nilai field (suku kuadratnya saling menghapus), jadi nilai tepat
+saat rekomendasi berubah didapat dari interpolasi linear selisih itu di
+antara dua titik grid yang mengapitnya.
+"""
+import math
+
+import numpy as np
+
+import credit_model
+from input_schema import _error
+
+# Jumlah titik default untuk range {"min", "max"} tanpa "steps"
+DEFAULT_STEPS = 21
+
+
+class WhatIfAxis:
+    """Satu field grid: nilai-nilainya + encoding-nya (slot kolom, block nilai)"""
+
+    def __init__(self, field, kind, values, slots, block):
+        self.field = field
+        self.kind = kind
+        self.values = values
+        self.slots = slots
+        self.block = block
+
+    def describe(self):
+        return {'field': self.field, 'type': self.kind, 'values': self.values}
+
+
+class WhatIfAnalysis:
+    """Grid perturbasi untuk satu applicant yang sudah lolos validasi schema"""
+
+    def __init__(self, model, applicant, axes):
+        self.model = model
+        self.applicant = applicant
+        self.axes = axes
+        self.shape = tuple(len(axis.values) for axis in axes)
+        # int Python (bukan int64 np.prod yang bisa overflow diam-diam ke 0)
+        self.size = math.prod(self.shape)
+        # Rekomendasi per cluster (sama dengan build_prediction di app)
+        self.cluster_outcomes = {}
+        for cluster_id in range(model.n_clusters):
+            info = model.cluster_stats.get(cluster_id, {})
+            recommendation, risk_level, color = credit_model.recommend(info.get('approval_rate', 1))
+            self.cluster_outcomes[cluster_id] = {
+                'recommendation': recommendation,
+                'risk_level': risk_level,
+                'color': color,
+                'approval_rate': float(info.get('approval_rate', 1)),
+                'default_rate': float(info.get('default_rate', 0)),
+            }
+        self._recommendations = np.array([self.cluster_outcomes[cluster_id]['recommendation']
+                                          for cluster_id in range(model.n_clusters)], dtype=object)
+
+    @classmethod
+    def parse(cls, model, schema, applicant, grid, max_steps):
+        """Bangun analisis dari spesifikasi grid {field: {"values": [...]} | {"min", "max", "steps"}}.
+
+        Return (analysis, errors); errors berbentuk sama dengan error schema
+        (field, error, message) dan analysis None kalau ada error.
+        """
+        if not isinstance(grid, dict) or not grid:
+            return None, [_error('grid', 'type', 'Field "grid" harus berupa object {field: spesifikasi}')]
+        axes, errors = [], []
+        for field, spec in grid.items():
+            axis, error = cls._parse_axis(model, schema, applicant, field, spec, max_steps)
+            if error:
+                errors.append(error)
+            else:
+                axes.append(axis)
+        if errors:
+            return None, errors
+        return cls(model, applicant, axes), []
+
+    @staticmethod
+    def _parse_axis(model, schema, applicant, field, spec, max_steps):
+        if field not in model.feature_columns:
+            return None, _error(field, 'field', f'Field "{field}" bukan fitur model')
+        categorical = field in model.categorical_levels
+        if categorical and spec in (None, {}):
+            spec = {'values': list(model.categorical_levels[field])}
+        if not isinstance(spec, dict):
+            return None, _error(field, 'grid', f'Grid "{field}" harus berupa object')
+
+        if 'values' in spec:
+            values = spec['values']
+            if not isinstance(values, list) or not values:
+                return None, _error(field, 'grid', f'Grid "{field}": "values" harus list yang tidak kosong')
+            if len(values) > max_steps:
+                return None, _error(field, 'steps', f'Grid "{field}": maksimal {max_steps} nilai')
+            checked = values
+        elif not categorical and 'min' in spec and 'max' in spec:
+            steps = spec.get('steps', DEFAULT_STEPS)
+            if isinstance(steps, bool) or not isinstance(steps, int) or not 2 <= steps <= max_steps:
+                return None, _error(field, 'steps', f'Grid "{field}": "steps" harus bilangan bulat 2..{max_steps}')
+            checked = [spec['min'], spec['max']]
+        else:
+            expected = '"values"' if categorical else '"values" atau "min" + "max"'
+            return None, _error(field, 'grid', f'Grid "{field}" harus berisi {expected}')
+
+        # Nilai grid harus lolos aturan schema yang sama dengan input applicant
+        if any(value is None for value in checked):
+            return None, _error(field, 'null', f'Grid "{field}" tidak boleh berisi null')
+        invalid = schema.validate_many([dict(applicant, **{field: value}) for value in checked])
+        if invalid:
+            i = min(invalid)
+            return None, dict(invalid[i][0], value=checked[i])
+
+        if categorical:
+            values = list(dict.fromkeys(checked))
+        elif 'values' in spec:
+            values = np.array(checked, dtype=np.float64)
+            # NaN (mis. literal NaN di JSON) lolos schema sebagai null untuk kolom nullable
+            if np.isnan(values).any():
+                return None, _error(field, 'null', f'Grid "{field}" tidak boleh berisi null / NaN')
+            values = np.unique(values).tolist()
+        else:
+            low, high = float(spec['min']), float(spec['max'])
+            if low != low or high != high:
+                return None, _error(field, 'null', f'Grid "{field}" tidak boleh berisi null / NaN')
+            if not low < high:
+                return None, _error(field, 'grid', f'Grid "{field}": "min" harus lebih kecil dari "max"')
+            values = np.linspace(low, high, steps).tolist()
+        slots, block = model.encode_field(field, values)
+        return WhatIfAxis(field, 'category' if categorical else 'number', values, slots, block), None
+
+    def run(self, include_membership=False):
+        """Score grid + garis per field + applicant dalam satu pass.
+
+        Return (result, base_distances): result siap di-serialize ke JSON,
+        base_distances = jarak applicant sendiri ke tiap centroid.
+        """
+        # Baris: [grid (size)] [garis field 1] ... [garis field n] [applicant]
+        line_starts = self.size + np.cumsum((0,) + self.shape)
+        X = np.repeat(self.model.encode(self.applicant)[np.newaxis], line_starts[-1] + 1, axis=0)
+        grid_index = np.indices(self.shape).reshape(len(self.shape), self.size)
+        for axis, index, start in zip(self.axes, grid_index, line_starts):
+            X[:self.size, axis.slots] = axis.block[index]
+            X[start:start + len(axis.values), axis.slots] = axis.block
+
+        distances = self.model.scaled_distances(self.model.scale(X))
+        nearest = np.argmin(distances, axis=1)
+
+        grid_nearest = nearest[:self.size]
+        surface = {'cluster_id': grid_nearest.reshape(self.shape).tolist()}
+        if include_membership:
+            _, expected_default_rate, _ = self.model.soft_assign(distances[:self.size])
+            surface['expected_default_rate'] = expected_default_rate.reshape(self.shape).tolist()
+        recommendation_counts = {}
+        for cluster_id, count in enumerate(np.bincount(grid_nearest, minlength=self.model.n_clusters)):
+            if count:
+                recommendation = self.cluster_outcomes[cluster_id]['recommendation']
+                recommendation_counts[recommendation] = recommendation_counts.get(recommendation, 0) + int(count)
+
+        sensitivity = []
+        for axis, start in zip(self.axes, line_starts):
+            line = slice(start, start + len(axis.values))
+            sensitivity.append(self._sensitivity(axis, nearest[line], distances[line]))
+
+        result = {
+            'axes': [axis.describe() for axis in self.axes],
+            'size': self.size,
+            'clusters': {str(cluster_id): outcome for cluster_id, outcome in self.cluster_outcomes.items()},
+            'surface': surface,
+            'recommendation_counts': recommendation_counts,
+            'sensitivity': sensitivity,
+        }
+        return result, distances[-1]
+
+    def _sensitivity(self, axis, nearest, distances):
+        """Hasil di garis satu field (field lain = nilai applicant) + titik rekomendasi berubah"""
+        recommendations = self._recommendations[nearest]
+        result = {'field': axis.field, 'cluster_id': nearest.tolist()}
+        if axis.kind == 'category':
+            by_recommendation = {}
+            for value, recommendation in zip(axis.values, recommendations):
+                by_recommendation.setdefault(recommendation, []).append(value)
+            result['by_recommendation'] = by_recommendation
+            return result
+
+        squared = distances ** 2
+        boundaries = []
+        for i in np.flatnonzero(recommendations[:-1] != recommendations[1:]):
+            before, after = nearest[i], nearest[i + 1]
+            low, high = axis.values[i], axis.values[i + 1]
+            # d_before^2 - d_after^2 linear terhadap nilai field: <= 0 di low, >= 0 di high
+            gap_low = squared[i, before] - squared[i, after]
+            gap_high = squared[i + 1, before] - squared[i + 1, after]
+            fraction = gap_low / (gap_low - gap_high) if gap_low != gap_high else 0.5
+            boundaries.append({
+                'threshold': float(np.clip(low + (high - low) * fraction, low, high)),
+                'between': [low, high],
+                'from': {'cluster_id': int(before), 'recommendation': recommendations[i]},
+                'to': {'cluster_id': int(after), 'recommendation': recommendations[i + 1]},
+            })
+        result['boundaries'] = boundaries
+        return result